@@ -1,9 +1,15 @@
-from flask import Flask, request, jsonify, render_template, session, redirect, url_for, flash
+from flask import Flask, Response, request, jsonify, render_template, session, redirect, url_for, flash
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
+from password_pool import PasswordPoolBusy, get_password_pool
 from nutri import NutritionistAgent
+from session_lane import SessionLanes, payload_hash
+from chat_archive import decode_content
+from meal_log import nutrition_summary as load_nutrition_summary, parse_nutrient_table
+from upload_screen import UploadRejected, UploadScreener
+from session_store import get_session_store
 import mysql.connector
-import os, uuid, logging
+import os, uuid, json, logging, threading
+from collections import OrderedDict
 
 # Configuração básica
 app = Flask(__name__)
@@ -15,20 +21,44 @@ app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10 MB
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Cache de agentes por session_id e user_id
-agent_cache = {}
+# Cache de agentes por session_id e user_id. Como o estado da sessão fica no
+# armazenamento compartilhado (session_store.py), o cache é só um atalho e pode ser pequeno
+agent_cache = OrderedDict()
+AGENT_CACHE_SIZE = int(os.getenv("NUTRI_AGENT_CACHE_SIZE", 200))
+agent_cache_lock = threading.Lock()
+
+# Um turno por vez em cada sessão (o agente e a memória não são thread-safe) e
+# requisições repetidas em andamento viram uma única chamada ao LLM
+session_lanes = SessionLanes()
+
+# Triagem local das imagens (formato, corrupção, GIF animado, fotos repetidas) antes do Gemini;
+# os hashes das fotos recentes ficam no armazenamento de sessões, visíveis para todos os workers
+upload_screener = UploadScreener(store=get_session_store())
+
+def get_agent_key(session_id: str, user_id: int = None) -> str:
+    return f"{user_id}_{session_id or 'anon'}"
 
 def get_agent(session_id: str, user_id: int = None, email: str = None):
     global agent_cache
     if not session_id:
         session_id = 'anon'
-    key = f"{user_id}_{session_id}"
-    if key in agent_cache:
-        return agent_cache[key]
+    key = get_agent_key(session_id, user_id)
+    with agent_cache_lock:
+        agent = agent_cache.get(key)
+        if agent is not None:
+            agent_cache.move_to_end(key)
+    if agent is not None:
+        # O estado da sessão fica no armazenamento compartilhado; outro worker pode ter atendido o último turno
+        agent.refresh()
+        return agent
     logger.info(f"Criando novo NutritionistAgent para user_id={user_id}, session_id={session_id}")
     mysql_config = None
-    agent = NutritionistAgent(session_id=session_id, mysql_config=mysql_config, user_id=user_id, email=email)
-    agent_cache[key] = agent
+    agent = NutritionistAgent(session_id=session_id, mysql_config=mysql_config, user_id=user_id, email=email,
+                              session_key=key)
+    with agent_cache_lock:
+        agent_cache[key] = agent
+        while len(agent_cache) > AGENT_CACHE_SIZE:
+            agent_cache.popitem(last=False)
     return agent
 
 # Conexão MySQL
@@ -63,8 +93,6 @@ def cadastro():
             flash("Preencha todos os campos!", "error")
             return redirect(url_for("cadastro"))
 
-        hashed_password = generate_password_hash(password)
-
         try:
             conn = get_db_connection()
             cursor = conn.cursor()
@@ -73,6 +101,12 @@ def cadastro():
                 flash("E-mail já cadastrado!", "error")
                 return redirect(url_for("cadastro"))
 
+            try:
+                hashed_password = get_password_pool().hash_password(password)
+            except PasswordPoolBusy:
+                flash("Servidor ocupado, tente novamente em instantes.", "error")
+                return redirect(url_for("cadastro"))
+
             cursor.execute("""
                 INSERT INTO users (first_name, last_name, birth_date, gender, email, password)
                 VALUES (%s,%s,%s,%s,%s,%s)
@@ -97,7 +131,14 @@ def login():
             cursor.execute("SELECT * FROM users WHERE email=%s", (email,))
             user = cursor.fetchone()
 
-            if not user or not check_password_hash(user["password"], password):
+            try:
+                # E-mail desconhecido não ocupa o pool, mas demora o mesmo que uma senha errada
+                valid = get_password_pool().verify_password(user["password"] if user else None, password)
+            except PasswordPoolBusy:
+                flash("Muitas tentativas de login agora, tente novamente em instantes.", "error")
+                return redirect(url_for("login"))
+
+            if not valid:
                 flash("E-mail ou senha inválidos!", "error")
                 return redirect(url_for("login"))
 
@@ -125,6 +166,33 @@ def chat_page():
         return redirect(url_for("login"))
     return render_template('chat.html')
 
+def _stream_history(conn, cursor, column, value, batch_size=200):
+    """Gera o JSON do histórico direto das linhas do MySQL, sem montar a lista inteira em memória."""
+    try:
+        cursor.execute(
+            f"SELECT id, message_type, content, content_z, timestamp FROM chat_history WHERE {column} = %s ORDER BY id ASC",
+            (value,)
+        )
+        yield '{"success": true, "history": ['
+        first = True
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for msg_id, message_type, content, content_z, timestamp in rows:
+                item = {
+                    "id": msg_id,
+                    "type": message_type,
+                    "content": decode_content(content, content_z),
+                    "timestamp": timestamp.isoformat() if timestamp else None,
+                }
+                yield ("" if first else ",") + json.dumps(item, ensure_ascii=False)
+                first = False
+        yield "]}"
+    finally:
+        cursor.close()
+        conn.close()
+
 @app.route("/chat_history", methods=["GET"])
 def chat_history():
     session_id = request.args.get("session_id")
@@ -132,18 +200,66 @@ def chat_history():
     if not session_id:
         return jsonify({"success": False, "error": "session_id não informado"}), 400
 
+    # Leitura direta no banco: não cria o agente (LLM, memória) só para devolver o histórico
+    column, value = ("user_id", user_id) if user_id else ("session_id", session_id)
+    conn = cursor = None
     try:
-        agent = get_agent(session_id=session_id, user_id=user_id)
-        history = agent.get_conversation_history(by_user=True)
-        return jsonify({"success": True, "history": history})
-    except Exception as e:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(*), MAX(id) FROM chat_history WHERE {column} = %s", (value,))
+        count, last_id = cursor.fetchone()
+
+        # ETag = quantidade + id da última mensagem: quem faz polling recebe 304 enquanto nada mudou;
+        # limpar o histórico ou arquivar meses antigos muda a contagem mesmo sem mensagem nova
+        etag = f"{count}-{last_id or 0}"
+        if request.if_none_match.contains(etag):
+            cursor.close()
+            conn.close()
+            response = Response(status=304)
+        else:
+            response = Response(_stream_history(conn, cursor, column, value),
+                                mimetype="application/json")
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+    except Exception:
         logger.exception("Erro ao buscar histórico")
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
         return jsonify({"success": False, "error": "Erro ao buscar histórico"}), 500
 
+@app.route("/nutrition_summary", methods=["GET"])
+def nutrition_summary():
+    """Totais de nutrientes do usuário logado, lidos das tabelas de totais (sem chamar o LLM)."""
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"success": False, "error": "Faça login para ver o resumo"}), 401
+    days = min(max(request.args.get("days", 7, type=int), 1), 90)
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        summary = load_nutrition_summary(conn, user_id, days)
+        return jsonify({"success": True, "days": days, **summary})
+    except Exception:
+        logger.exception("Erro ao buscar resumo nutricional")
+        return jsonify({"success": False, "error": "Erro ao buscar resumo nutricional"}), 500
+    finally:
+        if conn:
+            conn.close()
+
 @app.route("/health", methods=["GET"])
 def health():
     return jsonify({"status": "ok"})
 
+@app.route("/session_stats", methods=["GET"])
+def session_stats():
+    """Fila por sessão, pool de senhas e quantas chamadas ao LLM a triagem de imagens evitou."""
+    return jsonify({**session_lanes.stats(), "password_pool": get_password_pool().stats(),
+                    "uploads": upload_screener.stats()})
+
 @app.route("/chat", methods=["POST", "OPTIONS"])
 def chat():
     if request.method == "OPTIONS":
@@ -165,8 +281,11 @@ def chat():
 
         logger.info(f"[{session_id}] Mensagem recebida: {message}")
 
-        agent = get_agent(session_id=session_id, user_id=user_id, email=email)
-        response = agent.run_text(message)
+        response = session_lanes.run(
+            get_agent_key(session_id, user_id),
+            payload_hash("chat", message),
+            lambda: get_agent(session_id=session_id, user_id=user_id, email=email).run_text(message),
+        )
 
         logger.info(f"[{session_id}] Resposta gerada")
 
@@ -196,12 +315,34 @@ def analyze_image():
 
         file_ext = os.path.splitext(file.filename)[1]
         file_path = os.path.join(UPLOAD_FOLDER, f"{uuid.uuid4()}{file_ext}")
-        file.save(file_path)
-
-        agent = get_agent(session_id=session_id, user_id=user_id, email=email)
-        analysis_result = agent.run_image(file_path)
-
-        return jsonify({"success": True, "session_id": session_id, "response": analysis_result})
+        image_bytes = file.read()
+        with open(file_path, "wb") as f:
+            f.write(image_bytes)
+
+        agent_key = get_agent_key(session_id, user_id)
+
+        def analyse():
+            screening = None
+            try:
+                try:
+                    screening = upload_screener.screen(agent_key, file_path)
+                except UploadRejected as e:
+                    return {"success": False, "session_id": session_id, "error": str(e), "reason": e.reason}, 422
+                if screening.duplicate_of is not None:
+                    # Foto quase igual a uma já analisada nesta sessão: devolve a mesma análise
+                    return {"success": True, "session_id": session_id, "response": screening.duplicate_of,
+                            "deduplicated": True}, 200
+                result = get_agent(session_id=session_id, user_id=user_id, email=email).run_image(screening.path)
+                if parse_nutrient_table(result) is not None:
+                    upload_screener.remember(agent_key, screening.phash, result)
+                return {"success": True, "session_id": session_id, "response": result}, 200
+            finally:
+                # O primeiro quadro de um GIF animado é temporário, inclusive nas fotos repetidas
+                if screening is not None and screening.path != file_path and os.path.exists(screening.path):
+                    os.remove(screening.path)
+
+        body, status = session_lanes.run(agent_key, payload_hash("image", image_bytes), analyse)
+        return jsonify(body), status
 
     except Exception as e:
         logger.exception("Erro no endpoint /analyze_image")
@@ -0,0 +1,354 @@
+"""Particionamento mensal do chat_history e arquivamento das conversas frias.
+
+- O chat_history é particionado por mês (RANGE COLUMNS(timestamp)), com uma
+  partição por mês e a pmax de reserva; ensure_future_partitions abre os
+  próximos meses antes que cheguem.
+- Mensagens grandes (relatórios de análise de imagem) são gravadas comprimidas
+  com zlib em content_z; as pequenas continuam em content.
+- archive_cold_partitions copia cada partição antiga para um arquivo JSONL
+  comprimido (zstd se o pacote zstandard estiver instalado, senão gzip), confere
+  a contagem e só então remove a partição. export_history lê arquivos + tabela.
+- Limpar o histórico apaga as linhas da tabela e grava uma marca em
+  chat_history_purges; export_history pula as mensagens arquivadas anteriores
+  à marca, sem reescrever os arquivos.
+
+Uso:
+    python chat_archive.py migrate                  # converte uma tabela antiga (uma vez)
+    python chat_archive.py maintain --keep-months 6 # abre meses futuros e arquiva os frios
+    python chat_archive.py export --user-id 7 > historico.jsonl
+"""
+import argparse
+import glob
+import gzip
+import json
+import os
+import sys
+import zlib
+from datetime import date, datetime
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESS_THRESHOLD = int(os.getenv("NUTRI_COMPRESS_THRESHOLD", 2048))  # bytes
+ARCHIVE_DIR = os.getenv("NUTRI_ARCHIVE_DIR", "arquivo_chat")
+MONTHS_AHEAD = 3
+
+COLUMNS = "id, session_id, user_id, email, message_type, content, content_z, timestamp"
+
+
+# ----------------- Conteúdo comprimido -----------------
+def encode_content(text: str):
+    """(content, content_z) para o INSERT: textos grandes vão comprimidos."""
+    data = text.encode("utf-8")
+    if len(data) < COMPRESS_THRESHOLD:
+        return text, None
+    return None, zlib.compress(data, 6)
+
+def decode_content(content, content_z) -> str:
+    if content_z is not None:
+        return zlib.decompress(content_z).decode("utf-8")
+    return content or ""
+
+
+# ----------------- Partições -----------------
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def _partition_sql(month: date) -> str:
+    upper = _add_months(month, 1)
+    return f"PARTITION p{month:%Y%m} VALUES LESS THAN ('{upper:%Y-%m-%d}')"
+
+def _partitions_clause(first_month: date, last_month: date) -> str:
+    parts, month = [], first_month
+    while month <= last_month:
+        parts.append(_partition_sql(month))
+        month = _add_months(month, 1)
+    parts.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+    return ",\n    ".join(parts)
+
+
+def create_chat_history_table(cursor):
+    this_month = _month_start(date.today())
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS chat_history (
+            id INT AUTO_INCREMENT,
+            session_id VARCHAR(255) NOT NULL,
+            user_id INT NULL,
+            email VARCHAR(255) NULL,
+            message_type ENUM('human', 'ai') NOT NULL,
+            content TEXT NULL,
+            content_z MEDIUMBLOB NULL,
+            timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id, timestamp),
+            INDEX idx_session_id (session_id),
+            INDEX idx_user_id (user_id),
+            INDEX idx_email (email),
+            INDEX idx_timestamp (timestamp)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        PARTITION BY RANGE COLUMNS(timestamp) (
+            {_partitions_clause(this_month, _add_months(this_month, MONTHS_AHEAD))}
+        );
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS chat_history_purges (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NULL,
+            session_id VARCHAR(255) NULL,
+            purged_at DATETIME NOT NULL,
+            INDEX idx_user_id (user_id),
+            INDEX idx_session_id (session_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    """)
+
+
+def check_schema(cursor):
+    """Falha na subida se o chat_history ainda for o antigo (sem content_z): rode o migrate antes."""
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'chat_history' AND COLUMN_NAME = 'content_z'
+    """)
+    if cursor.fetchone()[0] == 0:
+        raise RuntimeError("chat_history sem a coluna content_z (tabela antiga); "
+                           "rode `python chat_archive.py migrate` antes de subir a API")
+
+
+def record_purge(cursor, user_id=None, session_id=None, purged_at=None):
+    """Marca o histórico do usuário (ou da sessão) como apagado até agora, inclusive o já arquivado."""
+    cursor.execute(
+        "INSERT INTO chat_history_purges (user_id, session_id, purged_at) VALUES (%s, %s, %s)",
+        (user_id, None if user_id else session_id, purged_at or datetime.now()),
+    )
+
+
+def list_partitions(cursor) -> list:
+    """[(nome, limite superior como texto)] das partições mensais, em ordem."""
+    cursor.execute("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'chat_history' AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """)
+    return [(name, description) for name, description in cursor.fetchall() if name != "pmax"]
+
+
+def ensure_future_partitions(cursor, months_ahead: int = MONTHS_AHEAD):
+    """Separa da pmax as partições dos próximos meses que ainda não existem."""
+    existing = {name for name, _ in list_partitions(cursor)}
+    if not existing:
+        return []  # tabela antiga, ainda não particionada (ver migrate)
+    this_month = _month_start(date.today())
+    missing = [_add_months(this_month, i) for i in range(months_ahead + 1)
+               if f"p{_add_months(this_month, i):%Y%m}" not in existing]
+    if missing:
+        cursor.execute(f"""
+            ALTER TABLE chat_history REORGANIZE PARTITION pmax INTO (
+                {", ".join(_partition_sql(month) for month in missing)},
+                PARTITION pmax VALUES LESS THAN (MAXVALUE)
+            )
+        """)
+    return [f"p{month:%Y%m}" for month in missing]
+
+
+def migrate(conn):
+    """Converte o chat_history antigo (sem partições, content sempre em TEXT)."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT MIN(timestamp) FROM chat_history")
+    oldest = cursor.fetchone()[0] or datetime.now()
+    this_month = _month_start(date.today())
+    cursor.execute("UPDATE chat_history SET timestamp = NOW() WHERE timestamp IS NULL")
+    cursor.execute("""
+        ALTER TABLE chat_history
+            MODIFY content TEXT NULL,
+            ADD COLUMN content_z MEDIUMBLOB NULL AFTER content,
+            MODIFY timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            DROP PRIMARY KEY,
+            ADD PRIMARY KEY (id, timestamp)
+    """)
+    cursor.execute(f"""
+        ALTER TABLE chat_history PARTITION BY RANGE COLUMNS(timestamp) (
+            {_partitions_clause(_month_start(oldest.date()), _add_months(this_month, MONTHS_AHEAD))}
+        )
+    """)
+    compressed = compress_existing(conn)
+    conn.commit()
+    cursor.close()
+    print(f"chat_history particionado por mês; {compressed} mensagens grandes comprimidas.")
+
+
+def compress_existing(conn, batch_size: int = 500) -> int:
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, timestamp, content FROM chat_history WHERE content_z IS NULL AND LENGTH(content) >= %s",
+                   (COMPRESS_THRESHOLD,))
+    rows = cursor.fetchall()
+    for start in range(0, len(rows), batch_size):
+        cursor.executemany(
+            "UPDATE chat_history SET content = NULL, content_z = %s WHERE id = %s AND timestamp = %s",
+            [(encode_content(content)[1], msg_id, timestamp) for msg_id, timestamp, content in rows[start:start + batch_size]],
+        )
+        conn.commit()
+    cursor.close()
+    return len(rows)
+
+
+# ----------------- Arquivamento -----------------
+def _open_archive(path: str, mode: str):
+    if path.endswith(".zst"):
+        if "w" in mode:
+            return zstandard.open(path, "wt", encoding="utf-8", cctx=zstandard.ZstdCompressor(level=10))
+        return zstandard.open(path, "rt", encoding="utf-8")
+    return gzip.open(path, mode + "t", encoding="utf-8")
+
+def _archive_extension() -> str:
+    return ".jsonl.zst" if zstandard else ".jsonl.gz"
+
+def _row_to_dict(row) -> dict:
+    msg_id, session_id, user_id, email, message_type, content, content_z, timestamp = row
+    return {
+        "id": msg_id,
+        "session_id": session_id,
+        "user_id": user_id,
+        "email": email,
+        "type": message_type,
+        "content": decode_content(content, content_z),
+        "timestamp": timestamp.isoformat() if timestamp else None,
+    }
+
+
+def archive_partition(conn, partition: str, out_dir: str = ARCHIVE_DIR, batch_size: int = 1000) -> int:
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"chat_history_{partition[1:]}{_archive_extension()}")
+    tmp_path = path + ".tmp" + _archive_extension()
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {COLUMNS} FROM chat_history PARTITION ({partition}) ORDER BY id")
+    written = 0
+    with _open_archive(tmp_path, "w") as out:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                out.write(json.dumps(_row_to_dict(row), ensure_ascii=False) + "\n")
+                written += 1
+    cursor.close()
+
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM chat_history PARTITION ({partition})")
+    expected = cursor.fetchone()[0]
+    if expected != written:
+        os.remove(tmp_path)
+        raise RuntimeError(f"{partition}: {written} linhas arquivadas, {expected} na tabela; partição mantida")
+    os.replace(tmp_path, path)
+    cursor.execute(f"ALTER TABLE chat_history DROP PARTITION {partition}")
+    cursor.close()
+    return written
+
+
+def archive_cold_partitions(conn, keep_months: int = 6, out_dir: str = ARCHIVE_DIR) -> dict:
+    """Arquiva as partições anteriores aos últimos `keep_months` meses."""
+    cutoff = f"p{_add_months(_month_start(date.today()), -keep_months):%Y%m}"
+    cursor = conn.cursor()
+    cold = [name for name, _ in list_partitions(cursor) if name < cutoff]
+    cursor.close()
+    archived = {}
+    for partition in cold:
+        archived[partition] = archive_partition(conn, partition, out_dir)
+        print(f"{partition}: {archived[partition]} mensagens arquivadas")
+    return archived
+
+
+def _purges(conn) -> dict:
+    """{("user", id) | ("session", id): última limpeza}."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT 'user', user_id, MAX(purged_at) FROM chat_history_purges WHERE user_id IS NOT NULL GROUP BY user_id
+        UNION ALL
+        SELECT 'session', session_id, MAX(purged_at) FROM chat_history_purges WHERE user_id IS NULL GROUP BY session_id
+    """)
+    purges = {(kind, key): purged_at for kind, key, purged_at in cursor.fetchall()}
+    cursor.close()
+    return purges
+
+
+def export_history(conn, user_id=None, session_id=None, out_dir: str = ARCHIVE_DIR):
+    """Mensagens do usuário/sessão em ordem: primeiro os arquivos, depois a tabela.
+
+    Mensagens arquivadas anteriores a uma limpeza do histórico (chat_history_purges) ficam de fora.
+    """
+    purges = _purges(conn)
+
+    def matches(item):
+        if user_id is not None:
+            if item["user_id"] != user_id:
+                return False
+        elif item["session_id"] != session_id:
+            return False
+        purged_at = max(purges.get(("user", item["user_id"]), datetime.min),
+                        purges.get(("session", item["session_id"]), datetime.min))
+        return item["timestamp"] is None or datetime.fromisoformat(item["timestamp"]) > purged_at
+
+    for path in sorted(glob.glob(os.path.join(out_dir, "chat_history_*.jsonl.*"))):
+        if ".tmp" in path or (path.endswith(".zst") and zstandard is None):
+            continue
+        with _open_archive(path, "r") as archive:
+            for line in archive:
+                item = json.loads(line)
+                if matches(item):
+                    yield item
+
+    column, value = ("user_id", user_id) if user_id is not None else ("session_id", session_id)
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {COLUMNS} FROM chat_history WHERE {column} = %s ORDER BY id", (value,))
+    for row in cursor:
+        item = _row_to_dict(row)
+        if matches(item):
+            yield item
+    cursor.close()
+
+
+def _connect():
+    import mysql.connector
+    return mysql.connector.connect(
+        host=os.getenv("MYSQL_HOST", "localhost"),
+        port=int(os.getenv("MYSQL_PORT", 3306)),
+        user=os.getenv("MYSQL_USER", "root"),
+        password=os.getenv("MYSQL_PASSWORD", ""),
+        database=os.getenv("MYSQL_DATABASE", "nutri_chat"),
+        charset="utf8mb4",
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partições mensais e arquivamento do chat_history.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate", help="particiona e comprime uma tabela chat_history antiga")
+    maintain = sub.add_parser("maintain", help="abre os próximos meses e arquiva os meses frios")
+    maintain.add_argument("--keep-months", type=int, default=6)
+    maintain.add_argument("--out-dir", default=ARCHIVE_DIR)
+    export = sub.add_parser("export", help="exporta o histórico (arquivo + tabela) em JSONL")
+    export.add_argument("--user-id", type=int)
+    export.add_argument("--session-id")
+    export.add_argument("--out-dir", default=ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    conn = _connect()
+    try:
+        if args.command == "migrate":
+            migrate(conn)
+        elif args.command == "maintain":
+            cursor = conn.cursor()
+            print("Partições criadas:", ensure_future_partitions(cursor) or "nenhuma")
+            cursor.close()
+            archive_cold_partitions(conn, args.keep_months, args.out_dir)
+        else:
+            if args.user_id is None and not args.session_id:
+                parser.error("informe --user-id ou --session-id")
+            for item in export_history(conn, args.user_id, args.session_id, args.out_dir):
+                sys.stdout.write(json.dumps(item, ensure_ascii=False) + "\n")
+    finally:
+        conn.close()
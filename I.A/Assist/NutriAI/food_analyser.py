@@ -8,7 +8,10 @@ import os
 from io import BytesIO
 from pydantic import PrivateAttr
 import traceback
+import re
+import threading
 from datetime import datetime
+from upload_screen import probe_image
 
 class FoodAnalyser(BaseTool):
     name: str = "food_analyser"
@@ -16,6 +19,8 @@ class FoodAnalyser(BaseTool):
     sugestões de uma nutricionista especializada em nutrição esportiva."""
 
     _llm: ChatGoogleGenerativeAI = PrivateAttr()
+    _usage: dict = PrivateAttr(default_factory=lambda: {'requests': 0, 'input_tokens': 0, 'output_tokens': 0})
+    _usage_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -47,6 +52,7 @@ class FoodAnalyser(BaseTool):
         _, ext = os.path.splitext(image_path.lower())
         if ext not in valid_extensions:
             raise ValueError(f"Formato de imagem não suportado: {ext}")
+        probe_image(image_path)  # confere formato e dimensões pelo cabeçalho, não só pela extensão
         return True
 
     def _process_image(self, image_path: str) -> str:
@@ -94,6 +100,30 @@ class FoodAnalyser(BaseTool):
 
 IMPORTANTE: Responda DIRETAMENTE com a tabela. Não faça raciocínio interno extenso.'''
 
+    def _invoke(self, messages, max_output_tokens: int = None, **kwargs):
+        """Chama o modelo e acumula requisições e tokens usados (ver get_usage)."""
+        llm = self._llm.bind(max_output_tokens=max_output_tokens) if max_output_tokens else self._llm
+        response = llm.invoke(messages, **kwargs)
+        usage = getattr(response, 'usage_metadata', None) or {}
+        with self._usage_lock:  # o mesmo analisador atende várias threads
+            self._usage['requests'] += 1
+            self._usage['input_tokens'] += usage.get('input_tokens', 0)
+            self._usage['output_tokens'] += usage.get('output_tokens', 0)
+        return response
+
+    def get_usage(self) -> dict:
+        with self._usage_lock:
+            return dict(self._usage)
+
+    def _format_result(self, image_path: str, tabela_texto: str) -> str:
+        return f"""ANÁLISE NUTRICIONAL DA REFEIÇÃO
+_Imagem: {os.path.basename(image_path)}_
+
+{tabela_texto}
+
+---
+**Dica da Nutricionista**: Para análises mais precisas, inclua informações sobre suas características (peso, altura, objetivos) e nível de atividade física!"""
+
     def _extract_content_from_response(self, response) -> str:
         """Extrai o conteúdo de texto do objeto AIMessage de forma robusta"""
         try:
@@ -152,7 +182,7 @@ IMPORTANTE: Responda DIRETAMENTE com a tabela. Não faça raciocínio interno ex
             ])
 
             # Invoca o modelo com configuração otimizada
-            response = self._llm.invoke(
+            response = self._invoke(
                 [system_message, human_message],
                 config={
                     'max_output_tokens': 4096,
@@ -191,7 +221,7 @@ IMPORTANTE: Responda DIRETAMENTE com a tabela. Não faça raciocínio interno ex
                     }
                 ])
                 
-                response = self._llm.invoke([simple_message])
+                response = self._invoke([simple_message])
                 tabela_texto = self._extract_content_from_response(response)
                 
                 if not tabela_texto or len(tabela_texto) < 50:
@@ -212,15 +242,7 @@ O modelo está consumindo todos os tokens em raciocínio interno e não gerando
 **Resposta bruta**: {str(response)[:300]}"""
             
             # Formata o resultado final
-            result_text = f"""ANÁLISE NUTRICIONAL DA REFEIÇÃO
-_Imagem: {os.path.basename(image_path)}_
-
-{tabela_texto}
-
----
-**Dica da Nutricionista**: Para análises mais precisas, inclua informações sobre suas características (peso, altura, objetivos) e nível de atividade física!"""
-
-            return result_text
+            return self._format_result(image_path, tabela_texto)
 
         except Exception as e:
             error_details = traceback.format_exc()
@@ -266,6 +288,123 @@ class BatchFoodAnalyser:
             })
         return results
 
+    # ----------------- Modo empacotado -----------------
+    PACK_MARKER = re.compile(r'^=== IMAGEM (\d+) ===\s*$', re.MULTILINE)
+
+    def _create_pack_prompt(self, total: int) -> str:
+        return self.analyser._create_analysis_prompt() + f'''
+
+ATENÇÃO: você receberá {total} imagens numeradas de 1 a {total}, cada uma uma refeição diferente.
+Responda com uma análise completa (tabela + avaliação + pontos positivos + sugestões) para CADA imagem,
+na ordem, começando cada análise com uma linha exatamente assim:
+
+=== IMAGEM N ===
+
+onde N é o número da imagem. Não escreva nada antes da primeira linha "=== IMAGEM 1 ===".'''
+
+    def _split_pack_response(self, text: str, total: int) -> dict:
+        """Separa a resposta por imagem; devolve {indice: texto} só com as partes aproveitáveis."""
+        parts = {}
+        markers = list(self.PACK_MARKER.finditer(text))
+        for i, marker in enumerate(markers):
+            index = int(marker.group(1))
+            end = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+            body = text[marker.end():end].strip()
+            if 1 <= index <= total and index not in parts and len(body) >= 50 and '|' in body:
+                parts[index] = body
+        return parts
+
+    def _analyze_pack(self, paths: list) -> list:
+        """Uma requisição para várias imagens; as que não vierem na resposta são refeitas uma a uma."""
+        packed = []  # índices (em paths) das imagens que puderam ser preparadas
+        content = []
+        for index, path in enumerate(paths):
+            try:
+                img_b64 = self.analyser._process_image(path)
+            except Exception as e:
+                print(f"Não foi possível preparar {os.path.basename(path)} ({e}), ficará fora do pacote")
+                continue
+            packed.append(index)
+            content.append({'type': 'text', 'text': f'Imagem {len(packed)} ({os.path.basename(path)}):'})
+            content.append({'type': 'image_url', 'image_url': {'url': f"data:image/jpeg;base64,{img_b64}", 'detail': 'high'}})
+
+        parts = {}
+        if packed:
+            try:
+                response = self.analyser._invoke(
+                    [SystemMessage(content=self._create_pack_prompt(len(packed))), HumanMessage(content=content)],
+                    max_output_tokens=min(8192, 1536 * len(packed)),  # a resposta cresce com o pacote
+                )
+                parts = self._split_pack_response(self.analyser._extract_content_from_response(response), len(packed))
+            except Exception:
+                print(f"Erro na análise empacotada:\n{traceback.format_exc()}")
+
+        position = {index: i for i, index in enumerate(packed, 1)}  # índice em paths -> número no pacote
+        analyses = []
+        for index, path in enumerate(paths):
+            i = position.get(index)
+            if i in parts:
+                analyses.append((self.analyser._format_result(path, parts[i]), False))
+            else:
+                print(f"Sem resposta separada para {os.path.basename(path)}, analisando sozinha...")
+                analyses.append((self.analyser.analyze_food_image(path), True))
+        return analyses
+
+    def analyze_packed(self, image_paths: list, pack_size: int = 4) -> tuple:
+        """Analisa as imagens em pacotes de `pack_size` por requisição.
+
+        Retorna (resultados, estatisticas); os resultados têm o mesmo formato de
+        analyze_multiple_images e as estatísticas trazem requisições e tokens por
+        imagem, para comparar tamanhos de pacote.
+        """
+        before = self.analyser.get_usage()
+        results, fallbacks = [], 0
+        for start in range(0, len(image_paths), pack_size):
+            pack = image_paths[start:start + pack_size]
+            print(f"Analisando imagens {start + 1}-{start + len(pack)}/{len(image_paths)} em uma requisição")
+            for path, (analysis, fallback) in zip(pack, self._analyze_pack(pack)):
+                fallbacks += fallback
+                results.append({
+                    'path': path,
+                    'filename': os.path.basename(path),
+                    'analysis': analysis,
+                    'fallback': fallback,
+                })
+
+        return results, self._usage_stats(before, len(image_paths), pack_size, fallbacks)
+
+    def _usage_stats(self, before: dict, images: int, pack_size: int, fallbacks: int = 0) -> dict:
+        after = self.analyser.get_usage()
+        used = {key: after[key] - before[key] for key in after}
+        total = images or 1
+        return {
+            'images': images,
+            'pack_size': pack_size,
+            'fallbacks': fallbacks,
+            **used,
+            'requests_per_image': round(used['requests'] / total, 3),
+            'input_tokens_per_image': round(used['input_tokens'] / total, 1),
+            'output_tokens_per_image': round(used['output_tokens'] / total, 1),
+        }
+
+    def compare_pack_sizes(self, image_paths: list, pack_sizes=(1, 2, 4, 8)) -> list:
+        """Roda as mesmas imagens com cada tamanho de pacote e imprime o custo por imagem."""
+        rows = []
+        for size in pack_sizes:
+            if size == 1:
+                before = self.analyser.get_usage()
+                self.analyze_multiple_images(image_paths)
+                stats = self._usage_stats(before, len(image_paths), 1)
+            else:
+                _, stats = self.analyze_packed(image_paths, size)
+            rows.append(stats)
+
+        print(f"\n{'pacote':>6} {'req/img':>8} {'tokens entrada/img':>19} {'tokens saída/img':>17} {'fallbacks':>10}")
+        for row in rows:
+            print(f"{row['pack_size']:>6} {row['requests_per_image']:>8} {row['input_tokens_per_image']:>19} "
+                  f"{row['output_tokens_per_image']:>17} {row['fallbacks']:>10}")
+        return rows
+
     def create_summary_report(self, results: list) -> str:
         """Cria relatório final com todas as análises"""
         report = f"""# RELATÓRIO DE ANÁLISES NUTRICIONAIS
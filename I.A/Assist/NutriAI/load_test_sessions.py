@@ -0,0 +1,102 @@
+"""Teste de carga sintético do estado de sessão compartilhado entre workers.
+
+Simula vários workers (processos) atendendo turnos de sessões que pulam de
+um worker para outro. Em cada turno o worker reidrata a sessão, "chama o
+LLM" (um sleep de --latencia ms) e grava o turno. Compara dois modos:
+
+- store:    janela recente do session_store (como o NutritionistAgent faz agora)
+- completo: relê o histórico inteiro da sessão (como era antes, a cada worker novo)
+
+Uso: python load_test_sessions.py --workers 1 2 4 --turnos 400 --historico 300
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from session_store import SQLiteSessionStore
+
+TEXTO = "Quero uma dieta com 150 g de proteína por dia e treino 5x por semana. " * 4
+
+
+def prepara(pasta, sessoes, historico, janela):
+    """Cria o histórico completo (stand-in do MySQL) e o estado das sessões."""
+    banco = sqlite3.connect(os.path.join(pasta, "historico.db"))
+    banco.execute("CREATE TABLE chat_history (id INTEGER PRIMARY KEY, session_id TEXT, message_type TEXT, content TEXT)")
+    banco.execute("CREATE INDEX idx_session_id ON chat_history (session_id)")
+    store = SQLiteSessionStore(os.path.join(pasta, "sessions.db"), janela)
+    for s in range(sessoes):
+        mensagens = [{"type": "human" if i % 2 == 0 else "ai", "content": TEXTO} for i in range(historico)]
+        banco.executemany("INSERT INTO chat_history (session_id, message_type, content) VALUES (?, ?, ?)",
+                          [(f"s{s}", m["type"], m["content"]) for m in mensagens])
+        store.append(f"s{s}", mensagens)
+    banco.commit()
+    banco.close()
+
+
+def trabalhador(args):
+    pasta, modo, turnos, sessoes, latencia, janela, semente = args
+    random.seed(semente)
+    store = SQLiteSessionStore(os.path.join(pasta, "sessions.db"), janela)
+    banco = sqlite3.connect(os.path.join(pasta, "historico.db"), timeout=30)
+    reidratacoes = []
+    for _ in range(turnos):
+        sessao = f"s{random.randrange(sessoes)}"
+        inicio = time.perf_counter()
+        if modo == "store":
+            estado = store.load(sessao)
+            mensagens = estado["messages"]
+        else:
+            mensagens = banco.execute("SELECT message_type, content FROM chat_history WHERE session_id = ? ORDER BY id",
+                                      (sessao,)).fetchall()
+        reidratacoes.append((time.perf_counter() - inicio) * 1000)
+        time.sleep(latencia / 1000)  # chamada ao LLM
+        turno = [{"type": "human", "content": "e no jantar?"}, {"type": "ai", "content": TEXTO}]
+        if modo == "store":
+            store.append(sessao, turno)
+        else:
+            banco.executemany("INSERT INTO chat_history (session_id, message_type, content) VALUES (?, ?, ?)",
+                              [(sessao, m["type"], m["content"]) for m in turno])
+            banco.commit()
+    return reidratacoes
+
+
+def executa(modo, workers, turnos, sessoes, historico, latencia, janela):
+    with tempfile.TemporaryDirectory() as pasta:
+        prepara(pasta, sessoes, historico, janela)
+        por_worker = turnos // workers
+        inicio = time.perf_counter()
+        with multiprocessing.Pool(workers) as pool:
+            resultados = pool.map(trabalhador, [(pasta, modo, por_worker, sessoes, latencia, janela, w)
+                                                for w in range(workers)])
+        segundos = time.perf_counter() - inicio
+    tempos = sorted(t for r in resultados for t in r)
+    return {
+        "modo": modo,
+        "workers": workers,
+        "turnos_por_s": round(len(tempos) / segundos, 1),
+        "reidratacao_p50_ms": round(statistics.median(tempos), 3),
+        "reidratacao_p95_ms": round(tempos[int(len(tempos) * 0.95) - 1], 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga do estado de sessão com vários workers.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--turnos", type=int, default=400, help="turnos no total, divididos entre os workers")
+    parser.add_argument("--sessoes", type=int, default=50)
+    parser.add_argument("--historico", type=int, default=300, help="mensagens já gravadas por sessão")
+    parser.add_argument("--latencia", type=float, default=20, help="latência simulada do LLM (ms)")
+    parser.add_argument("--janela", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'modo':<10}{'workers':>8}{'turnos/s':>10}{'reidr. p50 (ms)':>17}{'reidr. p95 (ms)':>17}")
+    for modo in ("completo", "store"):
+        for workers in args.workers:
+            r = executa(modo, workers, args.turnos, args.sessoes, args.historico, args.latencia, args.janela)
+            print(f"{r['modo']:<10}{r['workers']:>8}{r['turnos_por_s']:>10}"
+                  f"{r['reidratacao_p50_ms']:>17}{r['reidratacao_p95_ms']:>17}")
@@ -0,0 +1,165 @@
+"""Registro tipado das refeições analisadas e totais diários/semanais por usuário.
+
+A tabela de nutrientes que o FoodAnalyser devolve em markdown é lida no momento
+em que a análise é gravada: cada refeição vira uma linha em `meals` e os totais
+em `meal_daily_totals`/`meal_weekly_totals` são somados na mesma transação.
+Assim o /nutrition_summary responde só com leituras de chave primária, sem
+reprocessar o histórico nem chamar o LLM.
+"""
+import re
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+# Linha da tabela do prompt -> coluna
+NUTRIENTS = {
+    "calorias": "calories_kcal",
+    "carboidratos": "carbs_g",
+    "proteinas": "protein_g",
+    "gorduras totais": "fat_g",
+    "gorduras saturadas": "saturated_fat_g",
+    "fibras": "fiber_g",
+    "sodio": "sodium_mg",
+}
+COLUMNS = list(NUTRIENTS.values())
+
+_ACCENTS = str.maketrans("áàâãéêíóôõúç", "aaaaeeiooouc")
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)?")
+_RATING = re.compile(r"\*\*Avalia[çc][ãa]o\*\*:\s*\[?([^\]\n]+)", re.IGNORECASE)
+
+
+def _normalize(text: str) -> str:
+    return text.strip().strip("*").strip().lower().translate(_ACCENTS)
+
+def _parse_amount(text: str) -> Optional[float]:
+    """'450 kcal' -> 450; '20-25 g' -> 22.5; '1.200 mg' e '1,5 g' também são aceitos."""
+    text = re.sub(r"(\d)\.(\d{3})(?!\d)", r"\1\2", text)  # separador de milhar
+    numbers = [float(n.replace(",", ".")) for n in _NUMBER.findall(text)]
+    if not numbers:
+        return None
+    if len(numbers) >= 2 and re.search(r"\d\s*(?:-|–|a)\s*\d", text):
+        return round((numbers[0] + numbers[1]) / 2, 2)
+    return numbers[0]
+
+
+def parse_nutrient_table(analysis: str) -> Optional[dict]:
+    """Nutrientes da tabela markdown da análise; None se a tabela não trouxer calorias."""
+    values = {}
+    for line in analysis.splitlines():
+        if not line.strip().startswith("|"):
+            continue
+        cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+        if len(cells) < 2:
+            continue
+        column = NUTRIENTS.get(_normalize(cells[0]))
+        if column and column not in values:
+            values[column] = _parse_amount(cells[1])
+    if values.get("calories_kcal") is None:
+        return None
+    rating = _RATING.search(analysis)
+    values["rating"] = rating.group(1).strip()[:40] if rating else None
+    return values
+
+
+def create_meal_tables(cursor):
+    nutrient_columns = ",\n".join(f"            {column} DECIMAL(9,2) NULL" for column in COLUMNS)
+    total_columns = ",\n".join(f"            {column} DECIMAL(11,2) NOT NULL DEFAULT 0" for column in COLUMNS)
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS meals (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            session_id VARCHAR(255) NULL,
+            eaten_at DATETIME NOT NULL,
+{nutrient_columns},
+            rating VARCHAR(40) NULL,
+            INDEX idx_user_eaten_at (user_id, eaten_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    """)
+    for table, key in (("meal_daily_totals", "day"), ("meal_weekly_totals", "week_start")):
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                user_id INT NOT NULL,
+                {key} DATE NOT NULL,
+                meals INT NOT NULL DEFAULT 0,
+{total_columns},
+                PRIMARY KEY (user_id, {key})
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """)
+
+
+def _week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())  # semana começando na segunda
+
+def _upsert_total(cursor, table: str, key: str, user_id: int, day: date, values: dict):
+    amounts = [values.get(column) or 0 for column in COLUMNS]
+    cursor.execute(f"""
+        INSERT INTO {table} (user_id, {key}, meals, {", ".join(COLUMNS)})
+        VALUES (%s, %s, 1, {", ".join(["%s"] * len(COLUMNS))})
+        ON DUPLICATE KEY UPDATE meals = meals + 1,
+            {", ".join(f"{column} = {column} + VALUES({column})" for column in COLUMNS)}
+    """, (user_id, day, *amounts))
+
+
+def record_meal(conn, user_id: int, session_id: Optional[str], analysis: str,
+                eaten_at: Optional[datetime] = None) -> Optional[dict]:
+    """Grava a refeição e soma nos totais do dia e da semana; None se a análise não tiver tabela."""
+    values = parse_nutrient_table(analysis)
+    if values is None or user_id is None:
+        return None
+    eaten_at = eaten_at or datetime.now()
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        cursor.execute(f"""
+            INSERT INTO meals (user_id, session_id, eaten_at, {", ".join(COLUMNS)}, rating)
+            VALUES (%s, %s, %s, {", ".join(["%s"] * len(COLUMNS))}, %s)
+        """, (user_id, session_id, eaten_at, *[values.get(column) for column in COLUMNS], values["rating"]))
+        _upsert_total(cursor, "meal_daily_totals", "day", user_id, eaten_at.date(), values)
+        _upsert_total(cursor, "meal_weekly_totals", "week_start", user_id, _week_start(eaten_at.date()), values)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return values
+
+
+def _row_to_totals(row: dict) -> dict:
+    return {key: float(value) if key in COLUMNS else value for key, value in row.items()}
+
+def nutrition_summary(conn, user_id: int, days: int = 7, today: Optional[date] = None) -> dict:
+    """Totais por dia dos últimos `days` dias e da semana atual, direto das tabelas de totais."""
+    days = max(days, 1)
+    today = today or date.today()
+    first_day = today - timedelta(days=days - 1)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            SELECT day, meals, {", ".join(COLUMNS)}
+            FROM meal_daily_totals
+            WHERE user_id = %s AND day BETWEEN %s AND %s
+            ORDER BY day
+        """, (user_id, first_day, today))
+        daily = [_row_to_totals(row) for row in cursor.fetchall()]
+        cursor.execute(f"""
+            SELECT week_start, meals, {", ".join(COLUMNS)}
+            FROM meal_weekly_totals
+            WHERE user_id = %s AND week_start = %s
+        """, (user_id, _week_start(today)))
+        week = cursor.fetchone()
+    finally:
+        cursor.close()
+
+    for row in daily:
+        row["day"] = row["day"].isoformat()
+    if week:
+        week = _row_to_totals(week)
+        week["week_start"] = week["week_start"].isoformat()
+    else:
+        week = {"week_start": _week_start(today).isoformat(), "meals": 0, **{column: 0.0 for column in COLUMNS}}
+    return {
+        "daily": daily,
+        "week": week,
+        # Média sobre todos os `days` dias pedidos: dias sem refeição registrada contam como zero
+        "average_per_day": {column: round(sum(row[column] for row in daily) / days, 1) for column in COLUMNS},
+    }
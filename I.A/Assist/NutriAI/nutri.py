@@ -1,10 +1,13 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.agents import initialize_agent, AgentType
 from langchain.memory import ConversationBufferMemory
-from langchain.schema import BaseMessage, HumanMessage, AIMessage
+from langchain.schema import BaseMessage, HumanMessage, AIMessage, SystemMessage
 from dotenv import load_dotenv
 from food_analyser import FoodAnalyser
-import os, warnings, traceback
+from session_store import get_session_store
+from chat_archive import check_schema, create_chat_history_table, decode_content, encode_content, record_purge
+from meal_log import create_meal_tables, record_meal
+import os, warnings, traceback, threading
 import mysql.connector
 from datetime import datetime
 from typing import List, Optional
@@ -19,14 +22,18 @@ os.environ["GOOGLE_API_KEY"] = GOOGLE_API_KEY
 
 
 class MySQLChatHistory:
+    _tables_ready = False  # o CREATE TABLE roda uma vez por processo, não a cada agente
+
     def __init__(self, session_id: str, user_id: Optional[int], email: Optional[str], mysql_config: dict):
         self.session_id = session_id
         self.user_id = user_id
         self.email = email
         self.mysql_config = mysql_config
         self.connection = None
-        self._ensure_connection()
-        self._create_tables()
+        if not MySQLChatHistory._tables_ready:
+            self._ensure_connection()
+            self._create_tables()
+            MySQLChatHistory._tables_ready = True
 
     def _ensure_connection(self):
         try:
@@ -39,21 +46,10 @@ class MySQLChatHistory:
     def _create_tables(self):
         try:
             cursor = self.connection.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS chat_history (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    session_id VARCHAR(255) NOT NULL,
-                    user_id INT NULL,
-                    email VARCHAR(255) NULL,
-                    message_type ENUM('human', 'ai') NOT NULL,
-                    content TEXT NOT NULL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    INDEX idx_session_id (session_id),
-                    INDEX idx_user_id (user_id),
-                    INDEX idx_email (email),
-                    INDEX idx_timestamp (timestamp)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
-            """)
+            # Particionada por mês; os meses futuros são abertos pelo `chat_archive.py maintain`
+            create_chat_history_table(cursor)
+            check_schema(cursor)
+            create_meal_tables(cursor)
             self.connection.commit()
             cursor.close()
         except Exception as e:
@@ -65,17 +61,19 @@ class MySQLChatHistory:
         try:
             cursor = self.connection.cursor()
             message_type = "human" if isinstance(message, HumanMessage) else "ai"
+            content, content_z = encode_content(message.content)
             cursor.execute(
                 """
-                INSERT INTO chat_history (session_id, user_id, email, message_type, content, timestamp)
-                VALUES (%s, %s, %s, %s, %s, %s)
+                INSERT INTO chat_history (session_id, user_id, email, message_type, content, content_z, timestamp)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
                 """,
                 (
                     self.session_id,
                     self.user_id,
                     self.email,
                     message_type,
-                    message.content,
+                    content,
+                    content_z,
                     datetime.now(),
                 )
             )
@@ -86,14 +84,15 @@ class MySQLChatHistory:
             self.connection = None
             self._ensure_connection()
 
-    def get_messages(self, by_user: bool = False) -> List[BaseMessage]:
+    def get_rows(self, by_user: bool = False) -> List[tuple]:
+        """Linhas (message_type, content, timestamp) da sessão, ou do usuário se by_user, já descomprimidas."""
         self._ensure_connection()
         try:
             cursor = self.connection.cursor()
             if by_user and self.user_id:
                 cursor.execute(
                     """
-                    SELECT message_type, content, timestamp
+                    SELECT message_type, content, content_z, timestamp
                     FROM chat_history
                     WHERE user_id = %s
                     ORDER BY timestamp ASC
@@ -103,29 +102,56 @@ class MySQLChatHistory:
             else:
                 cursor.execute(
                     """
-                    SELECT message_type, content, timestamp
+                    SELECT message_type, content, content_z, timestamp
                     FROM chat_history
                     WHERE session_id = %s
                     ORDER BY timestamp ASC
                     """,
                     (self.session_id,)
                 )
-            results = cursor.fetchall()
+            results = [(message_type, decode_content(content, content_z), timestamp)
+                       for message_type, content, content_z, timestamp in cursor.fetchall()]
             cursor.close()
-
-            messages = []
-            for message_type, content, _ in results:
-                if message_type == "human":
-                    messages.append(HumanMessage(content=content))
-                else:
-                    messages.append(AIMessage(content=content))
-            return messages
+            return results
         except Exception as e:
             print(f"Erro ao recuperar mensagens: {e}")
             self.connection = None
             self._ensure_connection()
             return []
 
+    def get_recent_rows(self, limit: int) -> List[tuple]:
+        """Últimas `limit` mensagens da sessão, em ordem cronológica."""
+        self._ensure_connection()
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(
+                """
+                SELECT message_type, content, content_z, timestamp
+                FROM chat_history
+                WHERE session_id = %s
+                ORDER BY id DESC
+                LIMIT %s
+                """,
+                (self.session_id, limit)
+            )
+            results = [(message_type, decode_content(content, content_z), timestamp)
+                       for message_type, content, content_z, timestamp in cursor.fetchall()]
+            cursor.close()
+            return results[::-1]
+        except Exception as e:
+            print(f"Erro ao recuperar mensagens: {e}")
+            self.connection = None
+            return []
+
+    def get_messages(self, by_user: bool = False) -> List[BaseMessage]:
+        messages = []
+        for message_type, content, _ in self.get_rows(by_user=by_user):
+            if message_type == "human":
+                messages.append(HumanMessage(content=content))
+            else:
+                messages.append(AIMessage(content=content))
+        return messages
+
     def clear(self):
         self._ensure_connection()
         try:
@@ -134,6 +160,8 @@ class MySQLChatHistory:
                 cursor.execute("DELETE FROM chat_history WHERE user_id = %s", (self.user_id,))
             else:
                 cursor.execute("DELETE FROM chat_history WHERE session_id = %s", (self.session_id,))
+            # O que já foi para os arquivos frios é escondido pela marca de limpeza
+            record_purge(cursor, self.user_id, self.session_id)
             self.connection.commit()
             cursor.close()
         except Exception as e:
@@ -144,11 +172,46 @@ class MySQLChatHistory:
             self.connection.close()
 
 
+def _to_message(item: dict) -> BaseMessage:
+    return HumanMessage(content=item["content"]) if item["type"] == "human" else AIMessage(content=item["content"])
+
+
 class CustomConversationBufferMemory(ConversationBufferMemory):
-    def __init__(self, chat_history: MySQLChatHistory, **kwargs):
+    """Memória reidratada do armazenamento de sessões compartilhado entre workers.
+
+    Só a janela recente (e um resumo do que saiu dela) é carregada; o MySQL
+    continua guardando o histórico completo e só é lido quando a sessão ainda
+    não existe no armazenamento.
+    """
+
+    def __init__(self, chat_history: MySQLChatHistory, session_store=None, session_key: str = None, **kwargs):
         super().__init__(**kwargs)
         object.__setattr__(self, "chat_history_backend", chat_history)
-        self.chat_memory.messages = self.chat_history_backend.get_messages()
+        object.__setattr__(self, "session_store", session_store or get_session_store())
+        object.__setattr__(self, "session_key", session_key or chat_history.session_id)
+        object.__setattr__(self, "version", -1)
+        self.refresh()
+
+    def _apply_state(self, state: dict):
+        messages = [_to_message(item) for item in state["messages"]]
+        if state["summary"]:
+            messages.insert(0, SystemMessage(content=f"Resumo da conversa anterior: {state['summary']}"))
+        self.chat_memory.messages = messages
+        object.__setattr__(self, "version", state["version"])
+
+    def refresh(self):
+        """Recarrega a janela se outro worker atendeu um turno desta sessão."""
+        if self.version >= 0 and self.session_store.version(self.session_key) == self.version:
+            return
+        state = self.session_store.load(self.session_key)
+        if state is None:
+            rows = self.chat_history_backend.get_recent_rows(self.session_store.window)
+            state = self.session_store.append(
+                self.session_key,
+                [{"type": message_type, "content": content} for message_type, content, _ in rows],
+                {"user_id": self.chat_history_backend.user_id, "email": self.chat_history_backend.email},
+            )
+        self._apply_state(state)
 
     def save_context(self, inputs: dict, outputs: dict):
         super().save_context(inputs, outputs)
@@ -156,18 +219,42 @@ class CustomConversationBufferMemory(ConversationBufferMemory):
             recent_messages = self.chat_memory.messages[-2:]
             for message in recent_messages:
                 self.chat_history_backend.add_message(message)
+            state = self.session_store.append(self.session_key, [
+                {"type": "human" if isinstance(message, HumanMessage) else "ai", "content": message.content}
+                for message in recent_messages
+            ])
+            self._apply_state(state)
 
     def clear(self):
         super().clear()
         self.chat_history_backend.clear()
+        self._apply_state(self.session_store.clear(self.session_key))
+
+
+# Clientes do Gemini compartilhados pelo processo: reidratar um agente não recria conexões
+_shared_clients = {}
+_shared_lock = threading.Lock()
+
+def get_shared_llm() -> ChatGoogleGenerativeAI:
+    with _shared_lock:
+        if "llm" not in _shared_clients:
+            _shared_clients["llm"] = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.7)
+        return _shared_clients["llm"]
+
+def get_shared_analyser() -> FoodAnalyser:
+    with _shared_lock:
+        if "analyser" not in _shared_clients:
+            _shared_clients["analyser"] = FoodAnalyser()
+        return _shared_clients["analyser"]
 
 
 class NutritionistAgent:
-    def __init__(self, session_id: str, mysql_config: dict = None, user_id: Optional[int] = None, email: Optional[str] = None):
+    def __init__(self, session_id: str, mysql_config: dict = None, user_id: Optional[int] = None,
+                 email: Optional[str] = None, session_store=None, session_key: str = None):
         self.session_id = session_id
         self.user_id = user_id
         self.email = email
-        self.llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.7)
+        self.llm = get_shared_llm()
 
         system_prompt = """
         Você é uma nutricionista virtual especializada em nutrição esportiva.
@@ -199,6 +286,8 @@ class NutritionistAgent:
 
         self.memory = CustomConversationBufferMemory(
             chat_history=self.chat_history,
+            session_store=session_store,
+            session_key=session_key,
             memory_key="chat_history",
             return_messages=True,
         )
@@ -212,7 +301,10 @@ class NutritionistAgent:
             agent_kwargs={"system_message": system_prompt},
         )
 
-        self.analyser = FoodAnalyser()
+        self.analyser = get_shared_analyser()
+
+    def refresh(self):
+        self.memory.refresh()
 
     def run_text(self, input_text: str) -> str:
         try:
@@ -228,23 +320,31 @@ class NutritionistAgent:
             self.memory.save_context(
                 {"input": f"Análise de imagem: {image_path}"}, {"output": result}
             )
+            self._record_meal(result)
             return result
         except Exception:
             print(f"Erro imagem: {traceback.format_exc()}")
             return "Não foi possível analisar a imagem."
 
+    def _record_meal(self, analysis: str):
+        """Guarda os nutrientes da análise em `meals` e nos totais do dia/semana (ver meal_log.py)."""
+        if not self.user_id:
+            return
+        try:
+            self.chat_history._ensure_connection()
+            record_meal(self.chat_history.connection, self.user_id, self.session_id, analysis)
+        except Exception:
+            print(f"Erro ao registrar refeição: {traceback.format_exc()}")
+
     def get_conversation_history(self, by_user: bool = False) -> List[dict]:
-        messages = self.chat_history.get_messages(by_user=by_user)
-        history = []
-        for msg in messages:
-            history.append(
-                {
-                    "type": "human" if isinstance(msg, HumanMessage) else "ai",
-                    "content": msg.content,
-                    "timestamp": datetime.now().isoformat(),
-                }
-            )
-        return history
+        return [
+            {
+                "type": message_type,
+                "content": content,
+                "timestamp": timestamp.isoformat() if timestamp else None,
+            }
+            for message_type, content, timestamp in self.chat_history.get_rows(by_user=by_user)
+        ]
 
     def clear_history(self):
         self.memory.clear()
@@ -0,0 +1,219 @@
+"""Hash e verificação de senhas fora da thread da requisição.
+
+generate_password_hash/check_password_hash são lentos de propósito e ocupam
+CPU; rodando no processo do Flask, uma rajada de logins atrasa o /chat. Aqui
+eles vão para um pool de processos com fila limitada: acima do limite a
+requisição é recusada na hora (PasswordPoolBusy) em vez de enfileirar sem fim.
+
+O custo do hash é configurável por NUTRI_PASSWORD_METHOD (formato do werkzeug,
+ex.: "scrypt:32768:8:1" ou "pbkdf2:sha256:600000"); use --benchmark para medir.
+"""
+import argparse
+import os
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+PASSWORD_METHOD = os.getenv("NUTRI_PASSWORD_METHOD", "scrypt:32768:8:1")
+POOL_WORKERS = int(os.getenv("NUTRI_PASSWORD_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+MAX_PENDING = int(os.getenv("NUTRI_PASSWORD_MAX_PENDING", POOL_WORKERS * 8))
+TIMEOUT = float(os.getenv("NUTRI_PASSWORD_TIMEOUT", 10))
+
+
+class PasswordPoolBusy(Exception):
+    """Fila de hashing cheia: a requisição deve ser recusada (503) e tentada depois."""
+
+
+def _hash(password: str, method: str) -> str:
+    return generate_password_hash(password, method=method)
+
+def _verify(stored_hash: str, password: str) -> bool:
+    return check_password_hash(stored_hash, password)
+
+
+class PasswordPool:
+    def __init__(self, workers: int = POOL_WORKERS, max_pending: int = MAX_PENDING, method: str = PASSWORD_METHOD):
+        self.workers = workers
+        self.method = method
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._verify_seconds = None  # média móvel do tempo de uma verificação real
+        self._dummy_hash = None
+        self._warm_lock = threading.Lock()
+        self.counters = {"hashes": 0, "verifications": 0, "unknown_emails": 0, "rejected_busy": 0}
+
+    def _acquire_slot(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.counters["rejected_busy"] += 1
+            raise PasswordPoolBusy()
+
+    def _submit(self, fn, *args):
+        self._acquire_slot()
+        try:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # A vaga só volta quando o processo termina, mesmo se a requisição desistir antes
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=TIMEOUT)
+        except FutureTimeout:
+            with self._lock:
+                self.counters["rejected_busy"] += 1
+            raise PasswordPoolBusy()
+
+    def hash_password(self, password: str) -> str:
+        with self._lock:
+            self.counters["hashes"] += 1
+        return self._submit(_hash, password, self.method)
+
+    def verify_password(self, stored_hash, password: str) -> bool:
+        """Verifica a senha; sem hash (e-mail desconhecido) responde no mesmo tempo, sem gastar CPU."""
+        if not stored_hash:
+            return self._reject_unknown(password)
+        start = time.perf_counter()
+        ok = self._submit(_verify, stored_hash, password)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.counters["verifications"] += 1
+            self._verify_seconds = elapsed if self._verify_seconds is None else 0.8 * self._verify_seconds + 0.2 * elapsed
+        return ok
+
+    def warm_up(self):
+        """Sobe os processos e mede uma verificação real contra um hash descartável.
+
+        Feito uma vez, na criação do pool: assim todo e-mail desconhecido segue o
+        mesmo caminho (espera o tempo medido), inclusive o primeiro.
+        """
+        with self._warm_lock:
+            if self._dummy_hash is None:
+                self._dummy_hash = self._submit(_hash, "senha-inexistente", self.method)
+                self.verify_password(self._dummy_hash, "aquecimento")
+
+    def _reject_unknown(self, password: str) -> bool:
+        if self._verify_seconds is None:
+            self.warm_up()  # pool criado sem get_password_pool
+        with self._lock:
+            self.counters["unknown_emails"] += 1
+            expected = self._verify_seconds
+        # Ocupa uma vaga como um e-mail existente: com a fila cheia também responde "ocupado",
+        # e espera o tempo típico de uma verificação; quem tenta e-mails não distingue nenhum dos dois casos
+        self._acquire_slot()
+        try:
+            time.sleep(expected * random.uniform(0.9, 1.1))
+        finally:
+            self._slots.release()
+        return False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "workers": self.workers, "method": self.method,
+                    "verify_ms": round(self._verify_seconds * 1000, 1) if self._verify_seconds else None}
+
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_password_pool() -> PasswordPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PasswordPool()
+            _pool.warm_up()
+        return _pool
+
+
+# ----------------- Benchmark e teste de carga -----------------
+def benchmark(methods, rounds=5):
+    print(f"{'método':<26}{'hash (ms)':>11}{'verificação (ms)':>18}")
+    for method in methods:
+        hashes, checks = [], []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            stored = generate_password_hash("senha-de-teste", method=method)
+            hashes.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            check_password_hash(stored, "senha-de-teste")
+            checks.append((time.perf_counter() - start) * 1000)
+        print(f"{method:<26}{statistics.median(hashes):>11.1f}{statistics.median(checks):>18.1f}")
+
+
+def _chat_like_ticks(stop, latencies, interval=0.01):
+    """Simula o trabalho de um /chat (CPU leve em Python) e mede quanto ele atrasa."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        sum(i * i for i in range(2000))
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(interval)
+
+
+def login_storm(use_pool: bool, logins: int, threads: int, method: str):
+    stored = generate_password_hash("senha-de-teste", method=method)
+    pool = PasswordPool(method=method, max_pending=logins) if use_pool else None
+    if pool:
+        pool.verify_password(stored, "aquecimento")  # sobe os processos antes de medir
+    stop, latencies = threading.Event(), []
+    ticker = threading.Thread(target=_chat_like_ticks, args=(stop, latencies))
+    ticker.start()
+    time.sleep(0.5)
+    baseline = len(latencies)
+
+    def worker(count):
+        for _ in range(count):
+            if pool:
+                pool.verify_password(stored, "senha-errada")
+            else:
+                check_password_hash(stored, "senha-errada")
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(logins // threads,)) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    seconds = time.perf_counter() - start
+    stop.set()
+    ticker.join()
+    if pool:
+        pool.shutdown()
+
+    during = sorted(latencies[baseline:]) or [0.0]
+    before = sorted(latencies[:baseline]) or [0.0]
+    print(f"{'pool' if use_pool else 'inline':<8}{logins / seconds:>12.1f}{_p99(before):>18.2f}{_p99(during):>18.2f}")
+
+
+def _p99(values):
+    return values[min(len(values) - 1, int(len(values) * 0.99))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do custo do hash e teste de carga de logins.")
+    parser.add_argument("--benchmark", action="store_true", help="mede hash/verificação para cada método")
+    parser.add_argument("--methods", nargs="+",
+                        default=["pbkdf2:sha256:260000", "pbkdf2:sha256:600000", "scrypt:16384:8:1", "scrypt:32768:8:1"])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.methods)
+    else:
+        print(f"Rajada de {args.logins} logins ({PASSWORD_METHOD}) com um /chat simulado rodando ao lado")
+        print(f"{'modo':<8}{'logins/s':>12}{'chat p99 antes':>18}{'chat p99 durante':>18}")
+        login_storm(False, args.logins, args.threads, PASSWORD_METHOD)
+        login_storm(True, args.logins, args.threads, PASSWORD_METHOD)
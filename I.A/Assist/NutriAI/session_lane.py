@@ -0,0 +1,70 @@
+import hashlib
+import threading
+from concurrent.futures import Future
+
+
+def payload_hash(*parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SessionLanes:
+    """Executa um turno por vez em cada sessão; sessões diferentes continuam em paralelo.
+
+    Requisições idênticas (mesma sessão e mesmo hash do payload) que chegam
+    enquanto a primeira ainda está rodando não geram outra chamada ao LLM:
+    esperam e recebem a mesma resposta.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lanes = {}      # sessão -> {"lock": Lock, "depth": requisições na fila ou rodando}
+        self._inflight = {}   # (sessão, hash do payload) -> Future
+        self.counters = {"executed": 0, "coalesced": 0, "max_depth": 0}
+
+    def run(self, session_key: str, digest: str, fn):
+        key = (session_key, digest)
+        lane_owner = False
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.counters["coalesced"] += 1
+            else:
+                future = self._inflight[key] = Future()
+                lane = self._lanes.setdefault(session_key, {"lock": threading.Lock(), "depth": 0})
+                lane["depth"] += 1
+                self.counters["max_depth"] = max(self.counters["max_depth"], lane["depth"])
+                lane_owner = True
+        if not lane_owner:
+            return future.result()
+
+        try:
+            with lane["lock"]:
+                result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                self.counters["executed"] += 1
+                lane["depth"] -= 1
+                if lane["depth"] == 0:
+                    del self._lanes[session_key]
+
+    def stats(self) -> dict:
+        """Só números agregados: as chaves das sessões não saem daqui."""
+        with self._lock:
+            depths = [lane["depth"] for lane in self._lanes.values()]
+            return {
+                "active_lanes": len(depths),
+                "queued_total": sum(depths),
+                "queued_max": max(depths, default=0),
+                "in_flight": len(self._inflight),
+                **self.counters,
+            }
@@ -0,0 +1,219 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+# Quantas mensagens recentes ficam na janela de cada sessão
+SESSION_WINDOW = int(os.getenv("NUTRI_SESSION_WINDOW", 20))
+SUMMARY_MAX_CHARS = 1500
+# Quantas imagens analisadas por sessão ficam guardadas para a detecção de fotos repetidas
+RECENT_UPLOADS = 20
+
+
+def empty_state(meta: Optional[dict] = None) -> dict:
+    return {"messages": [], "summary": "", "meta": meta or {}, "version": 0}
+
+
+def merge_messages(state: dict, messages: List[dict], window: int, meta: Optional[dict] = None) -> dict:
+    """Acrescenta mensagens à janela; as que saem dela viram um resumo curto (sem chamar o LLM)."""
+    state["messages"].extend(messages)
+    dropped = state["messages"][:-window] if len(state["messages"]) > window else []
+    state["messages"] = state["messages"][-window:]
+    topics = [m["content"].strip().replace("\n", " ")[:120] for m in dropped if m["type"] == "human"]
+    if topics:
+        summary = (state["summary"] + " | " if state["summary"] else "") + " | ".join(topics)
+        state["summary"] = summary[-SUMMARY_MAX_CHARS:]
+    if meta:
+        state["meta"].update(meta)
+    state["meta"]["updated_at"] = time.time()
+    state["version"] += 1
+    return state
+
+
+class SQLiteSessionStore:
+    """Estado das sessões num arquivo SQLite compartilhado pelos workers da mesma máquina."""
+
+    def __init__(self, path: str = "sessions.db", window: int = SESSION_WINDOW):
+        self.path = path
+        self.window = window
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS session_state (
+                    session_key TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    version INTEGER NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS recent_uploads (
+                    session_key TEXT NOT NULL,
+                    seen_at REAL NOT NULL,
+                    phash TEXT NOT NULL,
+                    analysis TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_recent_uploads ON recent_uploads (session_key, seen_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_recent_uploads_seen_at ON recent_uploads (seen_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        return conn
+
+    def load(self, session_key: str) -> Optional[dict]:
+        row = self._connection().execute(
+            "SELECT data FROM session_state WHERE session_key = ?", (session_key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def version(self, session_key: str) -> int:
+        row = self._connection().execute(
+            "SELECT version FROM session_state WHERE session_key = ?", (session_key,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def save(self, session_key: str, state: dict):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO session_state (session_key, data, version) VALUES (?, ?, ?)",
+            (session_key, json.dumps(state, ensure_ascii=False), state["version"]),
+        )
+
+    def append(self, session_key: str, messages: List[dict], meta: Optional[dict] = None) -> dict:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")  # outro worker não intercala leitura e escrita da mesma sessão
+        try:
+            state = merge_messages(self.load(session_key) or empty_state(), messages, self.window, meta)
+            self.save(session_key, state)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return state
+
+    def clear(self, session_key: str) -> dict:
+        """Esvazia a sessão com uma versão nova, para os outros workers recarregarem."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            state = empty_state()
+            state["version"] = self.version(session_key) + 1
+            self.save(session_key, state)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return state
+
+    def recent_uploads(self, session_key: str, since: float) -> List[tuple]:
+        """[(momento, hash, análise)] das imagens da sessão desde `since`, da mais nova para a mais antiga."""
+        rows = self._connection().execute(
+            "SELECT seen_at, phash, analysis FROM recent_uploads WHERE session_key = ? AND seen_at >= ? "
+            "ORDER BY seen_at DESC LIMIT ?", (session_key, since, RECENT_UPLOADS)
+        ).fetchall()
+        return [(seen_at, int(phash, 16), analysis) for seen_at, phash, analysis in rows]
+
+    def remember_upload(self, session_key: str, phash: int, analysis: str, window: float):
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM recent_uploads WHERE seen_at < ?", (now - window,))  # de todas as sessões
+            conn.execute("INSERT INTO recent_uploads (session_key, seen_at, phash, analysis) VALUES (?, ?, ?, ?)",
+                         (session_key, now, format(phash, "x"), analysis))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+class RedisSessionStore:
+    """Mesmo contrato do SQLiteSessionStore, para workers em máquinas diferentes."""
+
+    def __init__(self, url: str, window: int = SESSION_WINDOW, ttl: int = 7 * 24 * 3600):
+        import redis
+        self.redis = redis.Redis.from_url(url)
+        self.window = window
+        self.ttl = ttl
+
+    def _key(self, session_key: str) -> str:
+        return f"nutri:session:{session_key}"
+
+    def _version_key(self, session_key: str) -> str:
+        # Versão numa chave própria: conferir se a sessão mudou não traz o estado inteiro
+        return f"nutri:session:{session_key}:version"
+
+    def load(self, session_key: str) -> Optional[dict]:
+        data = self.redis.get(self._key(session_key))
+        return json.loads(data) if data else None
+
+    def version(self, session_key: str) -> int:
+        version = self.redis.get(self._version_key(session_key))
+        return int(version) if version else 0
+
+    def _write(self, pipe, session_key: str, state: dict):
+        pipe.set(self._key(session_key), json.dumps(state, ensure_ascii=False), ex=self.ttl)
+        pipe.set(self._version_key(session_key), state["version"], ex=self.ttl)
+
+    def save(self, session_key: str, state: dict):
+        pipe = self.redis.pipeline()
+        self._write(pipe, session_key, state)
+        pipe.execute()
+
+    def append(self, session_key: str, messages: List[dict], meta: Optional[dict] = None) -> dict:
+        key = self._key(session_key)
+        result = {}
+
+        def update(pipe):
+            data = pipe.get(key)
+            state = merge_messages(json.loads(data) if data else empty_state(), messages, self.window, meta)
+            pipe.multi()
+            self._write(pipe, session_key, state)
+            result["state"] = state
+
+        self.redis.transaction(update, key)
+        return result["state"]
+
+    def clear(self, session_key: str) -> dict:
+        version_key = self._version_key(session_key)
+        result = {}
+
+        def update(pipe):
+            # A versão continua subindo depois da limpeza (ou da expiração do estado)
+            state = empty_state()
+            state["version"] = int(pipe.get(version_key) or 0) + 1
+            pipe.multi()
+            self._write(pipe, session_key, state)
+            result["state"] = state
+
+        self.redis.transaction(update, self._key(session_key), version_key)
+        return result["state"]
+
+    def recent_uploads(self, session_key: str, since: float) -> List[tuple]:
+        items = (json.loads(item) for item in self.redis.lrange(f"nutri:uploads:{session_key}", 0, -1))
+        return [(seen_at, int(phash, 16), analysis) for seen_at, phash, analysis in items if seen_at >= since]
+
+    def remember_upload(self, session_key: str, phash: int, analysis: str, window: float):
+        key = f"nutri:uploads:{session_key}"
+        pipe = self.redis.pipeline()
+        pipe.lpush(key, json.dumps([time.time(), format(phash, "x"), analysis], ensure_ascii=False))
+        pipe.ltrim(key, 0, RECENT_UPLOADS - 1)
+        pipe.expire(key, max(1, int(window)))
+        pipe.execute()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_session_store():
+    """Redis se NUTRI_REDIS_URL estiver definido; senão SQLite em NUTRI_SESSION_DB (padrão sessions.db)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            url = os.getenv("NUTRI_REDIS_URL")
+            _store = RedisSessionStore(url) if url else SQLiteSessionStore(os.getenv("NUTRI_SESSION_DB", "sessions.db"))
+        return _store
@@ -0,0 +1,156 @@
+"""Triagem local das imagens enviadas, antes de qualquer chamada ao Gemini.
+
+- Lê só o cabeçalho para conferir formato e dimensões (sem decodificar a imagem).
+- Detecta arquivos truncados/corrompidos com uma decodificação reduzida (draft).
+- GIF animado: usa só o primeiro quadro.
+- Fotos quase iguais da mesma sessão dentro de uma janela de tempo (hash
+  perceptual dHash) recebem a análise anterior, sem nova chamada ao LLM. Com um
+  `store` (session_store.py) os hashes recentes valem para todos os workers;
+  sem ele, ficam na memória do processo e cada worker só vê os próprios.
+"""
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+from PIL import Image, UnidentifiedImageError
+
+ALLOWED_FORMATS = {"JPEG", "MPO", "PNG", "WEBP", "BMP", "GIF"}
+MIN_SIDE = int(os.getenv("NUTRI_UPLOAD_MIN_SIDE", 64))
+MAX_PIXELS = int(os.getenv("NUTRI_UPLOAD_MAX_PIXELS", 40_000_000))
+DEDUP_WINDOW = float(os.getenv("NUTRI_DEDUP_WINDOW", 300))  # segundos
+DEDUP_DISTANCE = int(os.getenv("NUTRI_DEDUP_DISTANCE", 6))  # bits diferentes no hash de 64 bits
+
+
+class UploadRejected(ValueError):
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+@dataclass
+class ScreenResult:
+    path: str                     # arquivo a analisar (o primeiro quadro, no caso de GIF animado)
+    phash: int
+    duplicate_of: Optional[str] = None
+
+
+def probe_image(path: str):
+    """Confere formato e dimensões pelo cabeçalho; levanta UploadRejected se não servir."""
+    try:
+        with Image.open(path) as image:
+            image_format, (width, height) = image.format, image.size
+            frames = getattr(image, "n_frames", 1)
+    except UnidentifiedImageError:
+        raise UploadRejected("format", "O arquivo enviado não é uma imagem reconhecida.")
+    except Image.DecompressionBombError:
+        raise UploadRejected("too_large", "Imagem grande demais.")
+    if image_format not in ALLOWED_FORMATS:
+        raise UploadRejected("format", f"Formato de imagem não suportado: {image_format}")
+    if min(width, height) < MIN_SIDE:
+        raise UploadRejected("too_small", f"Imagem pequena demais ({width}x{height}); envie uma foto maior da refeição.")
+    if width * height > MAX_PIXELS:
+        raise UploadRejected("too_large", f"Imagem grande demais ({width}x{height}).")
+    return image_format, (width, height), frames
+
+
+def _dhash(image: Image.Image) -> int:
+    small = image.convert("L").resize((9, 8), Image.Resampling.BILINEAR)
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return bits
+
+
+def _frame_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".frame.png"
+
+
+class UploadScreener:
+    def __init__(self, window: float = DEDUP_WINDOW, max_distance: int = DEDUP_DISTANCE, store=None):
+        self.window = window
+        self.max_distance = max_distance
+        self.store = store
+        self._lock = threading.Lock()
+        self._recent = {}  # sessão -> deque[(momento, hash, análise)]
+        self.counters = {"screened": 0, "rejected": {}, "deduplicated": 0, "gif_first_frame": 0, "llm_calls_saved": 0}
+
+    def _count_rejection(self, reason: str):
+        with self._lock:
+            self.counters["rejected"][reason] = self.counters["rejected"].get(reason, 0) + 1
+            self.counters["llm_calls_saved"] += 1
+
+    def screen(self, session_key: str, path: str) -> ScreenResult:
+        with self._lock:
+            self.counters["screened"] += 1
+        try:
+            return self._screen(session_key, path)
+        except BaseException:
+            frame_path = _frame_path(path)
+            if os.path.exists(frame_path):
+                os.remove(frame_path)  # quadro salvo antes da falha não fica para trás
+            raise
+
+    def _screen(self, session_key: str, path: str) -> ScreenResult:
+        try:
+            image_format, _, frames = probe_image(path)
+            with Image.open(path) as image:
+                if image_format in ("JPEG", "MPO"):
+                    image.draft("RGB", (256, 256))  # decodifica em escala reduzida: barato e acusa truncamento
+                image.load()
+                if frames > 1:
+                    image.seek(0)
+                    frame = image.convert("RGB")
+                    path = _frame_path(path)
+                    frame.save(path)
+                    with self._lock:
+                        self.counters["gif_first_frame"] += 1
+                phash = _dhash(image)
+        except UploadRejected as e:
+            self._count_rejection(e.reason)
+            raise
+        except (OSError, SyntaxError, ValueError):
+            self._count_rejection("corrupt")
+            raise UploadRejected("corrupt", "A imagem está corrompida ou incompleta. Tente enviar novamente.")
+
+        previous = self._find_recent(session_key, phash)
+        if previous is not None:
+            with self._lock:
+                self.counters["deduplicated"] += 1
+                self.counters["llm_calls_saved"] += 1
+        return ScreenResult(path=path, phash=phash, duplicate_of=previous)
+
+    def _find_recent(self, session_key: str, phash: int) -> Optional[str]:
+        if self.store is not None:
+            for _, seen_hash, analysis in self.store.recent_uploads(session_key, time.time() - self.window):
+                if bin(seen_hash ^ phash).count("1") <= self.max_distance:
+                    return analysis
+            return None
+        now = time.monotonic()
+        with self._lock:
+            recent = self._recent.get(session_key)
+            if not recent:
+                return None
+            while recent and now - recent[0][0] > self.window:
+                recent.popleft()
+            for _, seen_hash, analysis in reversed(recent):
+                if bin(seen_hash ^ phash).count("1") <= self.max_distance:
+                    return analysis
+            if not recent:
+                del self._recent[session_key]
+        return None
+
+    def remember(self, session_key: str, phash: int, analysis: str):
+        if self.store is not None:
+            self.store.remember_upload(session_key, phash, analysis, self.window)
+            return
+        with self._lock:
+            self._recent.setdefault(session_key, deque(maxlen=20)).append((time.monotonic(), phash, analysis))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "rejected": dict(self.counters["rejected"])}
@@ -0,0 +1,208 @@
+# Benchmark da S.A.R.A.A – ingestão e respostas sem rede e sem API key
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from datetime import datetime
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+import saraa
+
+PERGUNTAS = [
+    'Qual é o assunto principal do documento?',
+    'Liste três informações importantes citadas.',
+    'Existe alguma data ou valor mencionado?',
+]
+
+RESPOSTA_FALSA = ('Senhor, com base no documento, o assunto principal é o catálogo de produtos '
+                  'e os itens citados possuem código, categoria e preço definidos.')
+
+
+# ======== FIXTURES SINTÉTICAS =========
+def _linha(i, j):
+    return f'Produto {i}-{j}: categoria Eletronicos, codigo {i:04d}{j:03d}, preco {10 + j},90 reais.'
+
+def gera_pdf(caminho, paginas, linhas_por_pagina=40):
+    """Escreve um PDF simples (Helvetica, só texto) sem depender de bibliotecas externas."""
+    objetos = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # /Pages, preenchido depois que os filhos tiverem número
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    filhos = []
+    for i in range(paginas):
+        texto = ' T* '.join(f'({_linha(i, j)}) Tj' for j in range(linhas_por_pagina))
+        conteudo = f'BT /F1 9 Tf 40 760 Td 18 TL {texto} ET'.encode('latin-1')
+        objetos.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(conteudo), conteudo))
+        numero_conteudo = len(objetos)
+        objetos.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % numero_conteudo)
+        filhos.append(len(objetos))
+    kids = ' '.join(f'{n} 0 R' for n in filhos)
+    objetos[1] = f'<< /Type /Pages /Kids [{kids}] /Count {len(filhos)} >>'.encode()
+
+    saida = bytearray(b'%PDF-1.4\n')
+    posicoes = []
+    for numero, corpo in enumerate(objetos, 1):
+        posicoes.append(len(saida))
+        saida += b'%d 0 obj\n%s\nendobj\n' % (numero, corpo)
+    inicio_xref = len(saida)
+    saida += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objetos) + 1)
+    saida += b''.join(b'%010d 00000 n \n' % p for p in posicoes)
+    saida += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objetos) + 1, inicio_xref)
+    with open(caminho, 'wb') as arquivo:
+        arquivo.write(saida)
+
+def gera_docx(caminho, paragrafos):
+    """Escreve um DOCX mínimo (apenas document.xml) compatível com python-docx."""
+    corpo = ''.join(f'<w:p><w:r><w:t>{_linha(i, 0)}</w:t></w:r></w:p>' for i in range(paragrafos))
+    ns = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    with zipfile.ZipFile(caminho, 'w', zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr('[Content_Types].xml',
+                      '<?xml version="1.0" encoding="UTF-8"?>'
+                      '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                      '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                      '<Default Extension="xml" ContentType="application/xml"/>'
+                      '<Override PartName="/word/document.xml" '
+                      'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+                      '</Types>')
+        docx.writestr('_rels/.rels',
+                      '<?xml version="1.0" encoding="UTF-8"?>'
+                      '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                      '<Relationship Id="rId1" Target="word/document.xml" '
+                      'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+                      '</Relationships>')
+        docx.writestr('word/_rels/document.xml.rels',
+                      '<?xml version="1.0" encoding="UTF-8"?>'
+                      '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"/>')
+        docx.writestr('word/document.xml',
+                      f'<?xml version="1.0" encoding="UTF-8"?><w:document {ns}><w:body>{corpo}</w:body></w:document>')
+
+def gera_csv(caminho, linhas):
+    with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(['nome', 'categoria', 'codigo', 'preco'])
+        for i in range(linhas):
+            escritor.writerow([f'Produto {i}', 'Eletronicos', f'{i:06d}', f'{10 + i % 90},90'])
+
+def gera_json(caminho, itens):
+    dados = [{'nome': f'Produto {i}', 'categoria': 'Eletronicos', 'codigo': f'{i:06d}', 'descricao': _linha(i, 0)}
+             for i in range(itens)]
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(dados, arquivo, ensure_ascii=False)
+
+def gera_fixtures(pasta, escala):
+    caminhos = {
+        'pdf': os.path.join(pasta, 'fixture.pdf'),
+        'docx': os.path.join(pasta, 'fixture.docx'),
+        'csv': os.path.join(pasta, 'fixture.csv'),
+        'json': os.path.join(pasta, 'fixture.json'),
+    }
+    gera_pdf(caminhos['pdf'], paginas=5 * escala)
+    gera_docx(caminhos['docx'], paragrafos=200 * escala)
+    gera_csv(caminhos['csv'], linhas=200 * escala)
+    gera_json(caminhos['json'], itens=200 * escala)
+    return caminhos
+
+
+# ======== MEDIÇÕES =========
+def mede_ingestao(carregar):
+    """Executa `carregar` medindo tempo e pico de memória alocada pelo Python."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    texto = saraa.junta_documentos(carregar())
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return texto, {'parse_s': round(segundos, 4), 'pico_memoria_kb': round(pico / 1024, 1), 'caracteres': len(texto)}
+
+def mede_respostas(texto, llm):
+    chain = saraa.cria_chain_contexto(llm=llm)
+    template = chain.first
+    latencias = []
+    tokens_prompt = None
+    for pergunta in PERGUNTAS:
+        if tokens_prompt is None:
+            mensagens = template.format_messages(documento_informado=texto, input=pergunta)
+            tokens_prompt = sum(saraa.conta_tokens(m.content) for m in mensagens)
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # a resposta é transmitida na tela
+            saraa.responde_com_contexto(texto, pergunta, chain=chain)
+        latencias.append(time.perf_counter() - inicio)
+    return {
+        'tokens_prompt': tokens_prompt,
+        'latencias_s': [round(l, 4) for l in latencias],
+        'latencia_media_s': round(statistics.mean(latencias), 4),
+    }
+
+def executa(escala=1, atraso=0.0):
+    # Modelo falso: transmite a resposta caractere a caractere, com atraso opcional por pedaço
+    llm = FakeListChatModel(responses=[RESPOSTA_FALSA], sleep=atraso or None)
+    saraa.define_chat(llm)
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        caminhos = gera_fixtures(pasta, escala)
+        cenarios = {
+            'pdf': lambda: saraa.carrega_arquivo_generico(caminhos['pdf']),
+            'pdf_lazy_5_paginas': lambda: saraa.carrega_pdf_paginas(caminhos['pdf'], 1, 5),
+            'docx': lambda: saraa.carrega_arquivo_generico(caminhos['docx']),
+            'csv': lambda: saraa.carrega_arquivo_generico(caminhos['csv']),
+            'json': lambda: saraa.carrega_arquivo_generico(caminhos['json']),
+        }
+        for nome, carregar in cenarios.items():
+            texto, metricas = mede_ingestao(carregar)
+            if texto:
+                metricas.update(mede_respostas(texto, llm))
+            else:
+                metricas['erro'] = 'nenhum conteúdo carregado'
+            resultados[nome] = metricas
+            print(f'{nome:>20}: {metricas}')
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sistema': platform.platform(),
+        'escala': escala,
+        'atraso_por_pedaco_s': atraso,
+        'resultados': resultados,
+    }
+
+def compara(atual, anterior):
+    print(f"\nComparação com {anterior['data']}:")
+    for nome, metricas in atual['resultados'].items():
+        antes = anterior['resultados'].get(nome)
+        if not antes:
+            continue
+        for chave in ('parse_s', 'pico_memoria_kb', 'latencia_media_s'):
+            if chave in metricas and antes.get(chave):
+                variacao = (metricas[chave] - antes[chave]) / antes[chave] * 100
+                print(f'{nome:>20} {chave:>16}: {antes[chave]} -> {metricas[chave]} ({variacao:+.1f}%)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark offline de ingestão e respostas da S.A.R.A.A.')
+    parser.add_argument('--escala', type=int, default=1, help='multiplica o tamanho das fixtures')
+    parser.add_argument('--atraso', type=float, default=0.0, help='segundos entre pedaços do modelo falso')
+    parser.add_argument('--saida', default=None, help='arquivo JSON de resultados')
+    parser.add_argument('--comparar', default=None, help='JSON de uma execução anterior')
+    args = parser.parse_args()
+
+    relatorio = executa(args.escala, args.atraso)
+    saida = args.saida or os.path.join('resultados_benchmark', f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(saida) or '.', exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f'\nResultados salvos em {saida}')
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            compara(relatorio, json.load(arquivo))
@@ -0,0 +1,211 @@
+# Rastreador web da S.A.R.A.A – busca várias páginas em paralelo com cache HTTP
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from urllib.parse import urljoin, urldefrag, urlparse
+from urllib.robotparser import RobotFileParser
+from xml.etree import ElementTree
+
+import httpx
+from bs4 import BeautifulSoup
+from langchain_core.documents import Document
+
+USER_AGENT = 'SARAA/1.0 (+https://github.com/DrkCde15/Python-I.A)'
+
+
+class CacheHTTP:
+    """Cache em disco para GET condicional (ETag / Last-Modified).
+
+    Guarda o corpo de cada URL em um arquivo e os validadores em `indice.json`;
+    numa nova ingestão do mesmo site, páginas inalteradas custam apenas um 304.
+    """
+
+    def __init__(self, pasta='.cache_web'):
+        self.pasta = pasta
+        os.makedirs(pasta, exist_ok=True)
+        self.caminho_indice = os.path.join(pasta, 'indice.json')
+        try:
+            with open(self.caminho_indice, encoding='utf-8') as arquivo:
+                self.indice = json.load(arquivo)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.indice = {}
+
+    def _arquivo(self, url):
+        return os.path.join(self.pasta, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html')
+
+    def cabecalhos(self, url):
+        entrada = self.indice.get(url)
+        if not entrada or not os.path.exists(self._arquivo(url)):
+            return {}
+        cabecalhos = {}
+        if entrada.get('etag'):
+            cabecalhos['If-None-Match'] = entrada['etag']
+        if entrada.get('last_modified'):
+            cabecalhos['If-Modified-Since'] = entrada['last_modified']
+        return cabecalhos
+
+    def le(self, url):
+        with open(self._arquivo(url), encoding='utf-8') as arquivo:
+            return arquivo.read()
+
+    def grava(self, url, resposta):
+        etag = resposta.headers.get('ETag')
+        last_modified = resposta.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return  # sem validadores não há como revalidar depois
+        with open(self._arquivo(url), 'w', encoding='utf-8') as arquivo:
+            arquivo.write(resposta.text)
+        self.indice[url] = {'etag': etag, 'last_modified': last_modified}
+
+    def salva(self):
+        with open(self.caminho_indice, 'w', encoding='utf-8') as arquivo:
+            json.dump(self.indice, arquivo, ensure_ascii=False, indent=2)
+
+
+class Rastreador:
+    """Busca páginas de um site em largura, respeitando robots.txt e um intervalo por host."""
+
+    def __init__(self, profundidade=1, max_paginas=50, mesmo_dominio=True, concorrencia=5,
+                 intervalo=0.5, pasta_cache='.cache_web', timeout=15):
+        self.profundidade = profundidade
+        self.max_paginas = max_paginas
+        self.mesmo_dominio = mesmo_dominio
+        self.concorrencia = concorrencia
+        self.intervalo = intervalo
+        self.timeout = timeout
+        self.cache = CacheHTTP(pasta_cache) if pasta_cache else None
+        self.robots = {}
+        self.ultimo_acesso = {}
+        self.travas_host = {}
+        self.estatisticas = {'200': 0, '304': 0, 'bloqueadas': 0, 'erros': 0}
+
+    # ----------------- Regras de acesso -----------------
+    async def _permitido(self, cliente, url):
+        partes = urlparse(url)
+        base = f'{partes.scheme}://{partes.netloc}'
+        if base not in self.robots:
+            regras = RobotFileParser()
+            try:
+                resposta = await cliente.get(base + '/robots.txt')
+                if resposta.status_code in (401, 403):
+                    regras.disallow_all = True  # robots.txt protegido: nada liberado (mesma regra do RobotFileParser.read)
+                else:
+                    regras.parse(resposta.text.splitlines() if resposta.status_code == 200 else [])
+            except httpx.HTTPError:
+                regras.parse([])
+            self.robots[base] = regras
+        return self.robots[base].can_fetch(USER_AGENT, url)
+
+    async def _espera_vez(self, host):
+        # Serializa o intervalo mínimo entre requisições ao mesmo host
+        trava = self.travas_host.setdefault(host, asyncio.Lock())
+        async with trava:
+            espera = self.ultimo_acesso.get(host, 0) + self.intervalo - time.monotonic()
+            if espera > 0:
+                await asyncio.sleep(espera)
+            self.ultimo_acesso[host] = time.monotonic()
+
+    # ----------------- Busca -----------------
+    async def _busca(self, cliente, semaforo, url):
+        """Retorna o HTML da página (da rede ou do cache) ou None."""
+        async with semaforo:
+            if not await self._permitido(cliente, url):
+                self.estatisticas['bloqueadas'] += 1
+                return None
+            await self._espera_vez(urlparse(url).netloc)
+            cabecalhos = self.cache.cabecalhos(url) if self.cache else {}
+            try:
+                resposta = await cliente.get(url, headers=cabecalhos)
+            except httpx.HTTPError as e:
+                print(f"Erro ao buscar {url}: {e}")
+                self.estatisticas['erros'] += 1
+                return None
+
+        if resposta.status_code == 304 and self.cache:
+            self.estatisticas['304'] += 1
+            return self.cache.le(url)
+        if resposta.status_code != 200 or 'html' not in resposta.headers.get('Content-Type', 'text/html'):
+            self.estatisticas['erros'] += 1
+            return None
+        self.estatisticas['200'] += 1
+        if self.cache:
+            self.cache.grava(url, resposta)
+        return resposta.text
+
+    def _links(self, url, sopa, dominio):
+        for ancora in sopa.find_all('a', href=True):
+            link, _ = urldefrag(urljoin(url, ancora['href']))
+            partes = urlparse(link)
+            if partes.scheme not in ('http', 'https'):
+                continue
+            if self.mesmo_dominio and partes.netloc != dominio:
+                continue
+            yield link
+
+    async def rastreia(self, urls_iniciais):
+        dominio = urlparse(urls_iniciais[0]).netloc
+        vistas = set(urls_iniciais)
+        nivel = list(urls_iniciais)
+        documentos = []
+        semaforo = asyncio.Semaphore(self.concorrencia)
+        limites = httpx.Limits(max_connections=self.concorrencia, max_keepalive_connections=self.concorrencia)
+
+        # Um único cliente reaproveita as conexões (keep-alive) entre todas as páginas
+        async with httpx.AsyncClient(headers={'User-Agent': USER_AGENT}, limits=limites,
+                                     timeout=self.timeout, follow_redirects=True) as cliente:
+            for profundidade in range(self.profundidade + 1):
+                if not nivel:
+                    break
+                htmls = await asyncio.gather(*(self._busca(cliente, semaforo, url) for url in nivel))
+                proximo = []
+                for url, html in zip(nivel, htmls):
+                    if html is None:
+                        continue
+                    sopa = BeautifulSoup(html, 'html.parser')
+                    titulo = sopa.title.get_text(strip=True) if sopa.title else ''
+                    documentos.append(Document(
+                        page_content=sopa.get_text(),
+                        metadata={'source': url, 'title': titulo, 'depth': profundidade},
+                    ))
+                    if profundidade == self.profundidade:
+                        continue
+                    for link in self._links(url, sopa, dominio):
+                        if link not in vistas and len(vistas) < self.max_paginas:
+                            vistas.add(link)
+                            proximo.append(link)
+                nivel = proximo
+
+        if self.cache:
+            self.cache.salva()
+        return documentos
+
+    async def urls_do_sitemap(self, url_sitemap):
+        async with httpx.AsyncClient(headers={'User-Agent': USER_AGENT}, timeout=self.timeout,
+                                     follow_redirects=True) as cliente:
+            resposta = await cliente.get(url_sitemap)
+            resposta.raise_for_status()
+        raiz = ElementTree.fromstring(resposta.content)
+        locs = [elemento.text.strip() for elemento in raiz.iter() if elemento.tag.endswith('loc') and elemento.text]
+        return locs[:self.max_paginas]
+
+
+def carrega_site_rastreado(url, profundidade=1, max_paginas=50, **opcoes):
+    """Versão síncrona para o menu: aceita uma URL inicial ou um sitemap (.xml)."""
+    rastreador = Rastreador(profundidade=profundidade, max_paginas=max_paginas, **opcoes)
+
+    async def executa():
+        if url.lower().endswith('.xml'):
+            urls = await rastreador.urls_do_sitemap(url)
+            rastreador.profundidade = 0  # o sitemap já lista as páginas
+            return await rastreador.rastreia(urls) if urls else []
+        return await rastreador.rastreia([url])
+
+    inicio = time.perf_counter()
+    documentos = asyncio.run(executa())
+    e = rastreador.estatisticas
+    print(f"{len(documentos)} páginas em {time.perf_counter() - inicio:.1f}s "
+          f"({e['200']} baixadas, {e['304']} do cache, {e['bloqueadas']} bloqueadas pelo robots.txt, {e['erros']} erros)")
+    return documentos
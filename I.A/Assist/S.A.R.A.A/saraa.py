@@ -1,41 +1,125 @@
 # S.A.R.A.A – Sistema Avançado de Respostas e Asistências Automatizadas
 
 from langchain_groq import ChatGroq
-from langchain.prompts import ChatPromptTemplate
+from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.documents import Document
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from langchain_core.rate_limiters import InMemoryRateLimiter
 from langchain_community.document_loaders import WebBaseLoader, YoutubeLoader, PyPDFLoader, TextLoader, CSVLoader, UnstructuredFileLoader, UnstructuredWordDocumentLoader, JSONLoader
+import argparse
+import asyncio
+import csv
+import itertools
+import json
 import os
 from dotenv import load_dotenv
+from pypdf import PdfReader
 import platform
 import subprocess
+import sys
+import time
 import traceback
 
 # ======== API KEY ========
 load_dotenv()  # Carrega variáveis de ambiente
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-if not GROQ_API_KEY:
-    raise EnvironmentError("GROQ_API_KEY não definida no .env")
+# Modo verboso: mostra tempo até o primeiro token e tokens/s (use --verbose ou SARAA_VERBOSE=1)
+VERBOSE = '--verbose' in sys.argv or os.getenv("SARAA_VERBOSE", "").lower() in ("1", "true", "sim")
 
-os.environ["GROQ_API_KEY"] = GROQ_API_KEY
+# Orçamento de tokens do histórico (o modelo tem contexto de 8192; o resto fica para a resposta)
+ORCAMENTO_HISTORICO = int(os.getenv("SARAA_ORCAMENTO_HISTORICO", 6000))
+# Resume os turnos descartados em vez de simplesmente esquecê-los (use --resumir ou SARAA_RESUMIR=1)
+RESUMIR_HISTORICO = '--resumir' in sys.argv or os.getenv("SARAA_RESUMIR", "").lower() in ("1", "true", "sim")
+
+MODELO = 'llama3-70b-8192'
+
+SISTEMA_SARAA = "Você é a SARAA, um assistente profissional que vai diretamente ao ponto, muito inteligente, frio e me chama de Senhor todas as vezes."
 
 # ======== INICIALIZAÇÃO =========
-try:
-    chat = ChatGroq(model='llama3-70b-8192')
-    print("SARAA inicializada com sucesso!")
-except Exception:
-    print("Erro ao inicializar a IA:")
-    traceback.print_exc()
-    exit()
+# O modelo só é criado no primeiro uso, então importar este módulo não exige API key
+_chat = None
+
+def verifica_api_key():
+    groq_api_key = os.getenv("GROQ_API_KEY")
+    if not groq_api_key:
+        raise EnvironmentError("GROQ_API_KEY não definida no .env")
+    return groq_api_key
+
+def obter_chat():
+    global _chat
+    if _chat is None:
+        verifica_api_key()
+        _chat = ChatGroq(model=MODELO)
+    return _chat
+
+def define_chat(llm):
+    """Substitui o modelo usado por todas as funções (ex: um modelo falso no benchmark)."""
+    global _chat
+    _chat = llm
 
 # ======== FUNÇÕES DE CARREGAMENTO =========
 def carrega_sites():
-    url = input('Digite a URL do site: ').strip()
-    return WebBaseLoader(url).load()
+    url = input('Digite a URL do site (ou de um sitemap .xml): ').strip()
+    while True:
+        profundidade = input('Profundidade do rastreamento (Enter para só esta página): ').strip()
+        if not profundidade or profundidade.isdecimal():
+            break
+        print("Profundidade inválida, digite um número inteiro (0, 1, 2...).")
+    if not profundidade and not url.lower().endswith('.xml'):
+        return WebBaseLoader(url).load()
+    from rastreador import carrega_site_rastreado  # httpx e bs4 só são exigidos por quem rastreia
+    return carrega_site_rastreado(url, profundidade=int(profundidade or 0))
 
 def carrega_pdf():
     caminho = carregar_arquivo('Digite o caminho do PDF (ex: C:/Users/Usuario/Documents/arquivo.pdf): ')
-    return PyPDFLoader(caminho).load()
+    while True:
+        try:
+            inicio, fim = interpreta_intervalo(input('Páginas (ex: 3-10, -20 para as 20 primeiras, Enter para todas): '))
+            break
+        except ValueError as e:
+            print(f"Intervalo inválido: {e}")
+    return carrega_pdf_paginas(caminho, inicio, fim)
+
+def interpreta_intervalo(texto):
+    """Converte '3-10', '-20' ou '7' em (inicio, fim); vazio significa todas as páginas.
+
+    Levanta ValueError para texto que não é número, página 0 ou intervalo invertido ('5-2').
+    """
+    texto = texto.strip()
+    if not texto:
+        return 1, None
+    try:
+        if '-' in texto:
+            inicio, fim = texto.split('-', 1)
+            inicio, fim = int(inicio or 1), int(fim) if fim else None
+        else:
+            inicio = fim = int(texto)
+    except ValueError:
+        raise ValueError("use números, como 3-10, -20 ou 7.")
+    if inicio < 1 or (fim is not None and fim < 1):
+        raise ValueError("as páginas começam em 1.")
+    if fim is not None and fim < inicio:
+        raise ValueError(f"a página final ({fim}) vem antes da inicial ({inicio}).")
+    return inicio, fim
+
+def carrega_pdf_paginas(caminho, inicio=1, fim=None):
+    """Gera as páginas do PDF uma a uma, sem montar a lista inteira na memória.
+
+    `inicio` e `fim` são numerados a partir de 1 (`fim` inclusivo). Nenhuma
+    página depois de `fim` é lida, então '-20' custa o mesmo em um PDF de 20
+    ou de 2.000 páginas.
+    """
+    if inicio <= 1:
+        yield from itertools.islice(PyPDFLoader(caminho).lazy_load(), fim)
+        return
+    # lazy_load extrairia o texto das páginas puladas; aqui o acesso é direto por índice
+    leitor = PdfReader(caminho)
+    ultima = len(leitor.pages) if fim is None else min(fim, len(leitor.pages))
+    for indice in range(inicio - 1, ultima):
+        yield Document(
+            page_content=leitor.pages[indice].extract_text() or '',
+            metadata={'source': caminho, 'page': indice},
+        )
 
 def carrega_video():
     link = input('Digite o link do vídeo do YouTube: ').strip()
@@ -50,12 +134,22 @@ def carregar_arquivo(mensagem_prompt="Digite o caminho do arquivo: "):
         else:
             return caminho
 
+def _paginas_restantes(paginas, caminho):
+    # As páginas seguintes são lidas fora do try do carregador: um erro nelas encerra o texto ali, com aviso
+    try:
+        yield from paginas
+    except Exception as e:
+        print(f"Erro ao ler o PDF {caminho}, usando só as páginas lidas até aqui: {e}")
+
 def carrega_arquivo_generico(caminho):
     extensao = os.path.splitext(caminho)[1].lower()
 
     try:
         if extensao == ".pdf":
-            return PyPDFLoader(caminho).load()
+            # Páginas sob demanda, como no modo PDF; a primeira é lida aqui para os erros de abertura caírem no except
+            paginas = carrega_pdf_paginas(caminho)
+            primeira = next(paginas, None)
+            return [] if primeira is None else itertools.chain([primeira], _paginas_restantes(paginas, caminho))
         elif extensao == ".txt":
             return TextLoader(caminho, encoding="utf-8").load()
         elif extensao == ".csv":
@@ -90,28 +184,236 @@ def abrir_arquivo(caminho):
         print(f"Erro ao tentar abrir o arquivo: {e}")
         return False
 
+# ======== STREAMING DE RESPOSTA =========
+def transmite_resposta(chain, entrada, prefixo='Assistente: '):
+    """Imprime os tokens conforme chegam e devolve o texto completo."""
+    partes = []
+    inicio = time.perf_counter()
+    primeiro_token = None
+    tokens_saida = None
+    print(prefixo, end='', flush=True)
+    for pedaco in chain.stream(entrada):
+        if pedaco.content:
+            if primeiro_token is None:
+                primeiro_token = time.perf_counter() - inicio
+            partes.append(pedaco.content)
+            print(pedaco.content, end='', flush=True)
+        uso = getattr(pedaco, 'usage_metadata', None)
+        if uso and uso.get('output_tokens'):
+            tokens_saida = uso['output_tokens']
+    print('\n')
+    total = time.perf_counter() - inicio
+
+    if VERBOSE and primeiro_token is not None:
+        # Sem usage_metadata, cada pedaço recebido conta como um token
+        tokens = tokens_saida or len(partes)
+        tempo_geracao = total - primeiro_token
+        taxa = tokens / tempo_geracao if tempo_geracao > 0 else float('inf')
+        print(f'[primeiro token: {primeiro_token:.2f}s | {tokens} tokens em {total:.2f}s | {taxa:.1f} tokens/s]\n')
+    return ''.join(partes)
+
+# ======== HISTÓRICO COM JANELA LIMITADA =========
+def conta_tokens(texto):
+    """Conta tokens com o tokenizador do modelo; sem ele, estima ~4 caracteres por token."""
+    try:
+        return obter_chat().get_num_tokens(texto)
+    except Exception:
+        return len(texto) // 4 + 1
+
+class HistoricoConversa:
+    """Mantém os turnos mais recentes dentro de um orçamento de tokens.
+
+    O prompt de sistema fica fora da lista (vai no template) e seu custo é
+    descontado do orçamento. Turnos antigos são descartados inteiros; com
+    `resumir=True` eles viram um resumo curto enviado junto da janela.
+    """
+
+    def __init__(self, prompt_sistema, orcamento_tokens=ORCAMENTO_HISTORICO, resumir=RESUMIR_HISTORICO):
+        self.orcamento = orcamento_tokens - conta_tokens(prompt_sistema)
+        self.resumir = resumir
+        self.mensagens = []
+        self.tokens = []  # tokens de cada mensagem, contados uma única vez
+        self.resumo = ''
+        self.tokens_resumo = 0
+
+    @property
+    def total_tokens(self):
+        return sum(self.tokens) + self.tokens_resumo
+
+    def adiciona(self, mensagem):
+        self.mensagens.append(mensagem)
+        # +4 cobre os marcadores de papel que o modelo adiciona por mensagem
+        self.tokens.append(conta_tokens(mensagem.content) + 4)
+        self._aplica_orcamento()
+
+    def _descarta_turno(self):
+        descartadas = [self.mensagens.pop(0)]
+        self.tokens.pop(0)
+        # Descarta o turno inteiro: não deixa uma resposta sem a pergunta
+        if len(self.mensagens) > 1 and isinstance(self.mensagens[0], AIMessage):
+            descartadas.append(self.mensagens.pop(0))
+            self.tokens.pop(0)
+        return descartadas
+
+    def _aplica_orcamento(self):
+        descartadas = []
+        # Sempre preserva a última mensagem, mesmo que sozinha estoure o orçamento
+        while self.total_tokens > self.orcamento and len(self.mensagens) > 1:
+            descartadas += self._descarta_turno()
+        if descartadas and self.resumir:
+            self._resume(descartadas)
+
+    def _resume(self, descartadas):
+        trecho = '\n'.join(
+            f"{'Usuário' if isinstance(m, HumanMessage) else 'Assistente'}: {m.content}" for m in descartadas
+        )
+        pedido = (
+            'Atualize o resumo da conversa em no máximo 5 frases, mantendo fatos e pedidos do usuário.\n'
+            f'Resumo atual: {self.resumo or "(vazio)"}\n\nNovos trechos:\n{trecho}'
+        )
+        try:
+            self.resumo = obter_chat().invoke([HumanMessage(content=pedido)]).content
+            self.tokens_resumo = conta_tokens(self.resumo) + 4
+        except Exception as e:
+            print(f"Erro ao resumir histórico: {e}")
+            return
+        # O resumo também consome orçamento; se não couber, descarta mais turnos (sem novo resumo)
+        while self.total_tokens > self.orcamento and len(self.mensagens) > 1:
+            self._descarta_turno()
+
+    def janela(self):
+        if self.resumo:
+            return [SystemMessage(content=f'Resumo da conversa anterior: {self.resumo}')] + self.mensagens
+        return list(self.mensagens)
+
 # ======== GERAR RESPOSTA COM CONTEXTO =========
-def responde_com_contexto(lista_docs, pergunta):
-    texto = ''.join(doc.page_content for doc in lista_docs)
+def cria_chain_contexto(instrucao='Você é um assistente amigável.', llm=None):
     template = ChatPromptTemplate.from_messages([
-        ('system', 'Você é um assistente amigável, que responde com base nestas informações: {documento_informado}'),
+        ('system', instrucao + ' Responda com base nestas informações: {documento_informado}'),
         ('user', '{input}')
     ])
-    chain = template | chat
-    return chain.invoke({'documento_informado': texto, 'input': pergunta}).content
+    return template | (llm or obter_chat())
+
+def junta_documentos(lista_docs):
+    # Aceita geradores (ex: carrega_pdf_paginas): cada página é consumida e descartada
+    return ''.join(doc.page_content for doc in lista_docs)
+
+def responde_com_contexto(lista_docs, pergunta, prefixo='Resposta: ', chain=None):
+    # Aceita o texto já unido para não refazer o join a cada pergunta
+    texto = lista_docs if isinstance(lista_docs, str) else junta_documentos(lista_docs)
+    chain = chain or cria_chain_contexto()
+    return transmite_resposta(chain, {'documento_informado': texto, 'input': pergunta}, prefixo)
+
+def conversa_com_documentos(documentos, instrucao, rotulo):
+    # Template, chain e texto do documento são montados uma vez por modo
+    chain = cria_chain_contexto(instrucao)
+    texto = junta_documentos(documentos)
+    while True:
+        pergunta = input(f"Usuário ({rotulo}): ")
+        if pergunta.strip().lower() in ['x', 'exit']:
+            break
+        responde_com_contexto(texto, pergunta, chain=chain)
 
 # ======== CHATPAD TRADICIONAL =========
-def resposta_do_bot(lista_mensagens):
+def cria_chain_conversa(prompt_sistema=SISTEMA_SARAA, llm=None):
     template = ChatPromptTemplate.from_messages([
-        SystemMessage(content='Você é um assistente amigável chamado Asimo')
-    ] + lista_mensagens)
-    chain = template | chat
-    return chain.invoke({}).content
+        ('system', prompt_sistema),
+        MessagesPlaceholder('historico'),
+    ])
+    return template | (llm or obter_chat())
 
-# ======== MENU PRINCIPAL =========
-print('Bem-vindo ao ChatBot da S.A.R.A.A! (Digite x para sair a qualquer momento.)\n')
+def resposta_do_bot(chain, historico):
+    return transmite_resposta(chain, {'historico': historico.janela()})
+
+# ======== MODO EM LOTE (NÃO INTERATIVO) =========
+def carrega_documentos(fontes):
+    """Carrega arquivos locais e URLs uma única vez para todo o lote."""
+    documentos = []
+    for fonte in fontes:
+        if fonte.startswith(('http://', 'https://')):
+            documentos.extend(WebBaseLoader(fonte).load())
+        else:
+            documentos.extend(carrega_arquivo_generico(fonte))
+    return documentos
+
+def le_perguntas(caminho):
+    """Lê perguntas de um JSONL ou CSV (campo/coluna `pergunta` ou `question`, `id` opcional)."""
+    perguntas = []
+    with open(caminho, encoding='utf-8', newline='') as arquivo:
+        if caminho.lower().endswith('.csv'):
+            linhas = csv.DictReader(arquivo)
+        else:
+            linhas = (json.loads(linha) for linha in arquivo if linha.strip())
+        for i, linha in enumerate(linhas, 1):
+            texto = linha.get('pergunta') or linha.get('question')
+            if texto:
+                perguntas.append({'id': linha.get('id') or str(i), 'pergunta': texto})
+    return perguntas
 
-menu_texto = ''' Selecione a opção desejada:
+async def _responde_em_lote(chain, texto, perguntas, saida, max_workers):
+    entradas = [{'documento_informado': texto, 'input': p['pergunta']} for p in perguntas]
+    resumo = {'total': len(perguntas), 'ok': 0, 'erros': 0, 'tokens_entrada': 0, 'tokens_saida': 0}
+    inicio = time.perf_counter()
+    with open(saida, 'w', encoding='utf-8') as arquivo:
+        # Cada resposta é gravada assim que fica pronta, fora da ordem de entrada
+        async for indice, resultado in chain.abatch_as_completed(
+            entradas, config={'max_concurrency': max_workers}, return_exceptions=True
+        ):
+            registro = dict(perguntas[indice], segundos=round(time.perf_counter() - inicio, 3))
+            if isinstance(resultado, Exception):
+                resumo['erros'] += 1
+                registro['erro'] = str(resultado)
+            else:
+                resumo['ok'] += 1
+                registro['resposta'] = resultado.content
+                uso = getattr(resultado, 'usage_metadata', None) or {}
+                resumo['tokens_entrada'] += uso.get('input_tokens', 0)
+                resumo['tokens_saida'] += uso.get('output_tokens', 0)
+            arquivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+            arquivo.flush()
+    resumo['segundos'] = round(time.perf_counter() - inicio, 2)
+    resumo['perguntas_por_segundo'] = round(resumo['total'] / resumo['segundos'], 2) if resumo['segundos'] else 0.0
+    return resumo
+
+def responde_em_lote(fontes, caminho_perguntas, saida, max_workers=4, requisicoes_por_minuto=30, llm=None,
+                     instrucao='Você é um assistente amigável e informativo. Use o conteúdo dos documentos carregados para responder.'):
+    """Responde todas as perguntas de um arquivo sobre o mesmo conjunto de documentos.
+
+    Os documentos são carregados e unidos uma vez; as perguntas rodam em paralelo
+    (até `max_workers` simultâneas) respeitando o limite de requisições da Groq.
+    Retorna o resumo de vazão, que também é impresso ao final.
+    """
+    documentos = carrega_documentos(fontes)
+    if not documentos:
+        raise ValueError("Nenhum documento pôde ser carregado.")
+    texto = junta_documentos(documentos)
+    perguntas = le_perguntas(caminho_perguntas)
+
+    if llm is None:
+        verifica_api_key()
+        limitador = InMemoryRateLimiter(requests_per_second=requisicoes_por_minuto / 60, max_bucket_size=max_workers)
+        llm = ChatGroq(model=MODELO, rate_limiter=limitador)
+    chain = cria_chain_contexto(instrucao, llm=llm)
+
+    resumo = asyncio.run(_responde_em_lote(chain, texto, perguntas, saida, max_workers))
+    print(f"{resumo['ok']}/{resumo['total']} respondidas ({resumo['erros']} erros) em {resumo['segundos']}s "
+          f"- {resumo['perguntas_por_segundo']} perguntas/s, "
+          f"{resumo['tokens_entrada']} tokens de entrada, {resumo['tokens_saida']} de saída")
+    return resumo
+
+def main_lote(argumentos):
+    parser = argparse.ArgumentParser(description='S.A.R.A.A em lote: responde perguntas sobre documentos.')
+    parser.add_argument('--lote', action='store_true')
+    parser.add_argument('--docs', nargs='+', required=True, help='arquivos ou URLs usados como contexto')
+    parser.add_argument('--perguntas', required=True, help='arquivo .jsonl ou .csv com as perguntas')
+    parser.add_argument('--saida', default='respostas.jsonl')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rpm', type=float, default=30, help='limite de requisições por minuto à Groq')
+    args, _ = parser.parse_known_args(argumentos)
+    responde_em_lote(args.docs, args.perguntas, args.saida, args.workers, args.rpm)
+
+# ======== MENU PRINCIPAL =========
+MENU_TEXTO = ''' Selecione a opção desejada:
 1 - Conversa com a SARAA
 2 - Pesquisa na Web
 3 - Leitor de Vídeos do YouTube
@@ -119,78 +421,71 @@ menu_texto = ''' Selecione a opção desejada:
 5 - Acessar arquivos do sistema
 '''
 
-mensagens = []
+def menu():
+    try:
+        obter_chat()
+        print("SARAA inicializada com sucesso!")
+    except Exception:
+        print("Erro ao inicializar a IA:")
+        traceback.print_exc()
+        return
 
-while True:
-    selecao = input(menu_texto).strip()
-    if selecao == '1':
-        mensagens.append(SystemMessage(content="Você é a SARAA, um assistente profissional que vai diretamente ao ponto, muito inteligente, frio e me chama de Senhor todas as vezes."))
-        try:
-            while True:
-                pergunta = input('Usuário: ')
-                if pergunta.strip().lower() in ['x', 'exit']:
-                    break
-                mensagens.append(HumanMessage(content=pergunta))
-                resposta = resposta_do_bot(mensagens)
-                mensagens.append(AIMessage(content=resposta))
-                print(f'\nAssistente: {resposta}\n')
-        except KeyboardInterrupt:
-            print("\nInterrupção detectada. Encerrando o chat.")
-        except Exception:
-            print("Erro inesperado:")
-            traceback.print_exc()
-        break
-
-    elif selecao == '2':
-        documentos = carrega_sites()
-        mensagens.append(SystemMessage(content='Você é um assistente amigável e informativo. Use o conteúdo do site carregado para responder.'))
-        while True:
-            pergunta = input("Usuário (Web): ")
-            if pergunta.strip().lower() in ['x', 'exit']:
-                break
-            resposta = responde_com_contexto(documentos, pergunta)
-            print(f'Resposta: {resposta}')
-        break
-
-    elif selecao == '3':
-        documentos = carrega_video()
-        mensagens.append(SystemMessage(content='Você é um assistente amigável e informativo. Use o conteúdo do vídeo carregado para responder.'))
-        while True:
-            pergunta = input("Usuário (YouTube): ")
-            if pergunta.strip().lower() in ['x', 'exit']:
-                break
-            resposta = responde_com_contexto(documentos, pergunta)
-            print(f'Resposta: {resposta}')
-        break
-
-    elif selecao == '4':
-        documentos = carrega_pdf()
-        mensagens.append(SystemMessage(content='Você é um assistente amigável e informativo. Use o conteúdo do PDF carregado para responder.'))
-        while True:
-            pergunta = input("Usuário (PDF): ")
-            if pergunta.strip().lower() in ['x', 'exit']:
-                break
-            resposta = responde_com_contexto(documentos, pergunta)
-            print(f'Resposta: {resposta}')
-        break
+    print('Bem-vindo ao ChatBot da S.A.R.A.A! (Digite x para sair a qualquer momento.)\n')
 
-    elif selecao == '5':
-        mensagens.append(SystemMessage(content='Você é um assistente amigável e informativo. Use o conteúdo do arquivo carregado para responder.'))
-        caminho_arquivo = carregar_arquivo('Digite o caminho do arquivo: ')
-        abrir_arquivo(caminho_arquivo)
+    while True:
+        selecao = input(MENU_TEXTO).strip()
+        if selecao == '1':
+            historico = HistoricoConversa(SISTEMA_SARAA)
+            chain_conversa = cria_chain_conversa(SISTEMA_SARAA)
+            try:
+                while True:
+                    pergunta = input('Usuário: ')
+                    if pergunta.strip().lower() in ['x', 'exit']:
+                        break
+                    historico.adiciona(HumanMessage(content=pergunta))
+                    print()
+                    resposta = resposta_do_bot(chain_conversa, historico)
+                    historico.adiciona(AIMessage(content=resposta))
+                    if VERBOSE:
+                        print(f'[histórico: {len(historico.mensagens)} mensagens, ~{historico.total_tokens}/{historico.orcamento} tokens]\n')
+            except KeyboardInterrupt:
+                print("\nInterrupção detectada. Encerrando o chat.")
+            except Exception:
+                print("Erro inesperado:")
+                traceback.print_exc()
+            break
 
-    documentos = carrega_arquivo_generico(caminho_arquivo)
-    if not documentos:
-        print("Erro ao carregar o conteúdo. Verifique se o tipo de arquivo é suportado.")
-        break
+        elif selecao == '2':
+            documentos = carrega_sites()
+            conversa_com_documentos(documentos, 'Você é um assistente amigável e informativo. Use o conteúdo do site carregado para responder.', 'Web')
+            break
 
-    while True:
-        pergunta = input("Usuário (Arquivo): ")
-        if pergunta.strip().lower() in ['x', 'exit']:
+        elif selecao == '3':
+            documentos = carrega_video()
+            conversa_com_documentos(documentos, 'Você é um assistente amigável e informativo. Use o conteúdo do vídeo carregado para responder.', 'YouTube')
+            break
+
+        elif selecao == '4':
+            documentos = carrega_pdf()
+            conversa_com_documentos(documentos, 'Você é um assistente amigável e informativo. Use o conteúdo do PDF carregado para responder.', 'PDF')
+            break
+
+        elif selecao == '5':
+            caminho_arquivo = carregar_arquivo('Digite o caminho do arquivo: ')
+            abrir_arquivo(caminho_arquivo)
+
+            documentos = carrega_arquivo_generico(caminho_arquivo)
+            if not documentos:
+                print("Erro ao carregar o conteúdo. Verifique se o tipo de arquivo é suportado.")
+                break
+
+            conversa_com_documentos(documentos, 'Você é um assistente amigável e informativo. Use o conteúdo do arquivo carregado para responder.', 'Arquivo')
             break
-        resposta = responde_com_contexto(documentos, pergunta)
-        print(f'Resposta: {resposta}')
-    break
 
+    print('\nMuito obrigado por utilizar a SARAA. Até mais, Senhor!')
 
-print('\nMuito obrigado por utilizar a SARAA. Até mais, Senhor!')
\ No newline at end of file
+if __name__ == '__main__':
+    if '--lote' in sys.argv:
+        main_lote(sys.argv[1:])
+    else:
+        menu()
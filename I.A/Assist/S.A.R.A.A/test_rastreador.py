@@ -0,0 +1,107 @@
+"""Rastreador contra um servidor local: python -m unittest test_rastreador (dentro de S.A.R.A.A)."""
+import asyncio
+import hashlib
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from rastreador import Rastreador
+except ImportError:  # httpx/bs4/langchain_core não instalados
+    Rastreador = None
+
+PAGINAS = {
+    '/': '<html><head><title>Início</title></head><body>inicio '
+         '<a href="/publico">público</a> <a href="/privado">privado</a></body></html>',
+    '/publico': '<html><body>conteudo publico</body></html>',
+    '/privado': '<html><body>conteudo privado</body></html>',
+}
+
+
+class SiteLocal(BaseHTTPRequestHandler):
+    robots = (200, 'User-agent: *\nDisallow: /privado\n')
+    requisicoes = []
+
+    def log_message(self, formato, *args):
+        pass
+
+    def do_GET(self):
+        self.requisicoes.append((self.path, self.headers.get('If-None-Match')))
+        if self.path == '/robots.txt':
+            status, corpo = self.robots
+            return self._responde(status, corpo, 'text/plain')
+        if self.path not in PAGINAS:
+            return self._responde(404, 'não encontrada', 'text/plain')
+        etag = '"' + hashlib.sha1(PAGINAS[self.path].encode('utf-8')).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self._responde(200, PAGINAS[self.path], 'text/html; charset=utf-8', {'ETag': etag})
+
+    def _responde(self, status, corpo, tipo, extras=None):
+        dados = corpo.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(dados)))
+        for nome, valor in (extras or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+
+@unittest.skipIf(Rastreador is None, 'dependências do rastreador ausentes')
+class TestRastreador(unittest.TestCase):
+    def setUp(self):
+        SiteLocal.robots = (200, 'User-agent: *\nDisallow: /privado\n')
+        SiteLocal.requisicoes = []
+        self.servidor = ThreadingHTTPServer(('127.0.0.1', 0), SiteLocal)
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.servidor.server_address[1]}/'
+        self.pasta = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+        self.pasta.cleanup()
+
+    def rastreia(self, profundidade=1):
+        rastreador = Rastreador(profundidade=profundidade, intervalo=0, pasta_cache=self.pasta.name, timeout=5)
+        documentos = asyncio.run(rastreador.rastreia([self.url]))
+        return rastreador, sorted(doc.metadata['source'].replace(self.url, '/') for doc in documentos)
+
+    def test_respeita_disallow_do_robots(self):
+        rastreador, paginas = self.rastreia()
+        self.assertEqual(paginas, ['/', '/publico'])
+        self.assertEqual(rastreador.estatisticas['bloqueadas'], 1)
+        self.assertNotIn('/privado', [caminho for caminho, _ in SiteLocal.requisicoes])
+
+    def test_robots_protegido_bloqueia_tudo(self):
+        for status in (401, 403):
+            with self.subTest(status=status):
+                SiteLocal.robots = (status, 'acesso negado')
+                SiteLocal.requisicoes = []
+                rastreador, paginas = self.rastreia()
+                self.assertEqual(paginas, [])
+                self.assertEqual(rastreador.estatisticas['bloqueadas'], 1)
+                self.assertEqual([caminho for caminho, _ in SiteLocal.requisicoes], ['/robots.txt'])
+
+    def test_robots_inexistente_libera_tudo(self):
+        SiteLocal.robots = (404, 'não encontrado')
+        _, paginas = self.rastreia()
+        self.assertEqual(paginas, ['/', '/privado', '/publico'])
+
+    def test_segunda_ingestao_usa_o_cache(self):
+        _, primeira = self.rastreia()
+        SiteLocal.requisicoes = []
+        rastreador, segunda = self.rastreia()
+        self.assertEqual(segunda, primeira)
+        self.assertEqual((rastreador.estatisticas['200'], rastreador.estatisticas['304']), (0, 2))
+        # As páginas foram pedidas com o ETag guardado
+        self.assertTrue(all(etag for caminho, etag in SiteLocal.requisicoes if caminho != '/robots.txt'))
+
+
+if __name__ == '__main__':
+    unittest.main()
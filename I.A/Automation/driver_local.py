@@ -0,0 +1,144 @@
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+CACHE_PADRAO = os.path.join(PASTA, '.drivers', 'chromedriver.json')
+
+# ROBOS_DRIVER_REDE=1 permite baixar o driver quando não há nenhum local (padrão: só offline)
+PERMITIR_REDE = os.getenv('ROBOS_DRIVER_REDE', '').lower() in ('1', 'true', 'sim')
+
+_resolucao = None
+_trava = threading.Lock()
+_descartados = set()  # drivers recusados pelo Chrome instalado nesta execução
+
+
+def _le_cache(caminho_cache):
+    try:
+        with open(caminho_cache, encoding='utf-8') as arquivo:
+            caminho = json.load(arquivo).get('caminho')
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return caminho if caminho and os.path.isfile(caminho) else None
+
+def fixa_no_cache(caminho, origem, caminho_cache=CACHE_PADRAO):
+    """Guarda o caminho do driver para as próximas execuções não precisarem procurar de novo."""
+    os.makedirs(os.path.dirname(caminho_cache), exist_ok=True)
+    with open(caminho_cache, 'w', encoding='utf-8') as arquivo:
+        json.dump({'caminho': caminho, 'origem': origem, 'data': time.strftime('%Y-%m-%d %H:%M:%S')}, arquivo, indent=2)
+
+def _selenium_manager_offline():
+    # O Selenium Manager (selenium >= 4.20) consulta o próprio cache em ~/.cache/selenium sem ir à rede
+    try:
+        from selenium.webdriver.common.selenium_manager import SeleniumManager
+        caminhos = SeleniumManager().binary_paths(['--browser', 'chrome', '--offline'])
+    except Exception:
+        return None
+    caminho = caminhos.get('driver_path')
+    return caminho if caminho and os.path.isfile(caminho) else None
+
+def _webdriver_manager():
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+def resolve_chromedriver(permitir_rede=None, caminho_cache=CACHE_PADRAO, descartar=()):
+    """Encontra o chromedriver na ordem mais barata primeiro.
+
+    1. CHROMEDRIVER_PATH (versão fixada manualmente)
+    2. cache local em .drivers/chromedriver.json
+    3. chromedriver no PATH
+    4. cache do Selenium Manager, em modo offline
+    5. rede (webdriver_manager), só se permitido
+
+    Caminhos em `descartar` (driver de outra versão do Chrome) são ignorados.
+    Retorna (caminho, origem).
+    """
+    permitir_rede = PERMITIR_REDE if permitir_rede is None else permitir_rede
+
+    fixado = os.getenv('CHROMEDRIVER_PATH')
+    if fixado and os.path.isfile(fixado) and fixado not in descartar:
+        return fixado, 'CHROMEDRIVER_PATH'
+
+    caminho = _le_cache(caminho_cache)
+    if caminho and caminho not in descartar:
+        return caminho, 'cache'
+
+    for origem, buscar in (('PATH', lambda: shutil.which('chromedriver')), ('selenium-manager', _selenium_manager_offline)):
+        caminho = buscar()
+        if caminho and caminho not in descartar:
+            fixa_no_cache(caminho, origem, caminho_cache)
+            return caminho, origem
+
+    if not permitir_rede:
+        raise RuntimeError('chromedriver não encontrado localmente. Defina CHROMEDRIVER_PATH ou rode uma vez '
+                           'com ROBOS_DRIVER_REDE=1 para baixar e fixar no cache.')
+    caminho = _webdriver_manager()
+    fixa_no_cache(caminho, 'rede', caminho_cache)
+    return caminho, 'rede'
+
+
+def pre_aquecer(permitir_rede=None):
+    """Começa a resolver o driver em segundo plano assim que o processo inicia."""
+    global _resolucao
+    with _trava:
+        if _resolucao is None:
+            _resolucao = Future()
+            resultado = _resolucao
+
+            def resolve():
+                inicio = time.perf_counter()
+                try:
+                    caminho, origem = resolve_chromedriver(permitir_rede, descartar=set(_descartados))
+                    resultado.set_result((caminho, origem, time.perf_counter() - inicio))
+                except Exception as e:
+                    resultado.set_exception(e)
+
+            threading.Thread(target=resolve, daemon=True).start()
+        return _resolucao
+
+def descarta(caminho, caminho_cache=CACHE_PADRAO):
+    """Esquece um driver recusado pelo Chrome (atualizado desde que o cache foi fixado)."""
+    global _resolucao
+    with _trava:
+        _descartados.add(caminho)
+        _resolucao = None
+        if _le_cache(caminho_cache) == caminho:
+            os.remove(caminho_cache)
+
+def caminho_chromedriver(permitir_rede=None):
+    """(caminho, origem, segundos gastos na resolução); reaproveita o pré-aquecimento se houver."""
+    return pre_aquecer(permitir_rede).result()
+
+def servico_chrome(registro=None):
+    """Service do Chrome com o driver resolvido; o log guarda quanto a inicialização esperou por ele."""
+    from selenium.webdriver.chrome.service import Service
+    inicio = time.perf_counter()
+    try:
+        caminho, origem, resolucao = caminho_chromedriver()
+    except Exception as e:
+        if registro:
+            registro.registra_etapa('resolve_driver', time.perf_counter() - inicio, erro=e)
+        raise
+    if registro:
+        registro.registra_etapa('resolve_driver', time.perf_counter() - inicio, origem=origem,
+                                resolucao_s=round(resolucao, 4))
+    return Service(caminho)
+
+def inicia_chrome(opcoes=None, registro=None):
+    """Abre o Chrome; se o driver do cache não servir para a versão instalada, resolve de novo uma vez."""
+    from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
+    for tentativa in (1, 2):
+        servico = servico_chrome(registro)
+        try:
+            if registro is None:
+                return webdriver.Chrome(service=servico, options=opcoes)
+            with registro.etapa('inicia_driver'):
+                return webdriver.Chrome(service=servico, options=opcoes)
+        except SessionNotCreatedException:
+            if tentativa == 2:
+                raise
+            descarta(servico.path)
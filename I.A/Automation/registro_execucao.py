@@ -0,0 +1,127 @@
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class RegistroExecucao:
+    """Cronometra as etapas dos robôs e grava um log JSON lines da execução.
+
+    Cada etapa (navegação, espera, preenchimento, envio...) vira uma linha com
+    a duração, a linha da planilha (quando houver) e o resultado. Sem
+    `caminho`, as medições ficam só em memória para o resumo final.
+    """
+
+    def __init__(self, caminho=None, robo=''):
+        self.robo = robo
+        self.execucao = uuid.uuid4().hex[:8]
+        self.trava = threading.Lock()
+        self.duracoes = {}
+        self.resultados = {}
+        self.arquivo = open(caminho, 'a', encoding='utf-8') if caminho else None
+
+    def _grava(self, evento):
+        evento = {'execucao': self.execucao, 'robo': self.robo,
+                  'data': datetime.now().isoformat(timespec='milliseconds'), **evento}
+        with self.trava:
+            if self.arquivo:
+                self.arquivo.write(json.dumps(evento, ensure_ascii=False, default=str) + '\n')
+                self.arquivo.flush()
+
+    def registra_etapa(self, nome, segundos, linha=None, erro=None, **extras):
+        with self.trava:
+            self.duracoes.setdefault(nome, []).append(segundos)
+        evento = {'etapa': nome, 'segundos': round(segundos, 4), 'resultado': 'erro' if erro else 'ok'}
+        if linha is not None:
+            evento['linha'] = linha
+        if erro:
+            evento['erro'] = str(erro).splitlines()[0] if str(erro) else type(erro).__name__
+        self._grava({**evento, **extras})
+
+    @contextmanager
+    def etapa(self, nome, linha=None, **extras):
+        inicio = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self.registra_etapa(nome, time.perf_counter() - inicio, linha, erro=e, **extras)
+            raise
+        self.registra_etapa(nome, time.perf_counter() - inicio, linha, **extras)
+
+    def resultado(self, linha, situacao, segundos=None, **extras):
+        """Resultado final de uma linha (ok, falha, duplicada...)."""
+        with self.trava:
+            self.resultados[situacao] = self.resultados.get(situacao, 0) + 1
+        evento = {'tipo': 'linha', 'linha': linha, 'situacao': situacao}
+        if segundos is not None:
+            evento['segundos'] = round(segundos, 4)
+        self._grava({**evento, **extras})
+
+    def resumo(self, mais_lentas=5):
+        with self.trava:
+            return resume_duracoes(self.duracoes, mais_lentas), dict(self.resultados)
+
+    def imprime_resumo(self, mais_lentas=5):
+        etapas, resultados = self.resumo(mais_lentas)
+        imprime_etapas(etapas)
+        if resultados:
+            print('Linhas: ' + ', '.join(f'{situacao}={total}' for situacao, total in resultados.items()))
+
+    def fecha(self):
+        if self.arquivo:
+            self.arquivo.close()
+            self.arquivo = None
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+def resume_duracoes(duracoes, mais_lentas=5):
+    """Ordena as etapas pelo tempo total gasto (onde os segundos por linha realmente vão)."""
+    etapas = []
+    for nome, valores in duracoes.items():
+        etapas.append({
+            'etapa': nome,
+            'vezes': len(valores),
+            'total_s': round(sum(valores), 3),
+            'media_s': round(sum(valores) / len(valores), 4),
+            'p95_s': round(_percentil(valores, 95), 4),
+            'max_s': round(max(valores), 4),
+        })
+    etapas.sort(key=lambda etapa: etapa['total_s'], reverse=True)
+    return etapas[:mais_lentas] if mais_lentas else etapas
+
+def imprime_etapas(etapas):
+    print(f"\n{'etapa':<32}{'vezes':>7}{'total(s)':>10}{'média(s)':>10}{'p95(s)':>9}{'máx(s)':>9}")
+    for etapa in etapas:
+        print(f"{etapa['etapa']:<32}{etapa['vezes']:>7}{etapa['total_s']:>10}{etapa['media_s']:>10}"
+              f"{etapa['p95_s']:>9}{etapa['max_s']:>9}")
+
+def resume_arquivo(caminho, execucao=None, mais_lentas=10):
+    """Lê um log já gravado e mostra as etapas mais lentas (da última execução, por padrão)."""
+    with open(caminho, encoding='utf-8') as arquivo:
+        eventos = [json.loads(linha) for linha in arquivo if linha.strip()]
+    if not eventos:
+        print('Log vazio.')
+        return []
+    execucao = execucao or eventos[-1]['execucao']
+    duracoes = {}
+    for evento in eventos:
+        if evento['execucao'] == execucao and 'etapa' in evento:
+            duracoes.setdefault(evento['etapa'], []).append(evento['segundos'])
+    print(f'Execução {execucao}:')
+    etapas = resume_duracoes(duracoes, mais_lentas)
+    imprime_etapas(etapas)
+    return etapas
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or not os.path.exists(sys.argv[1]):
+        print('Uso: python registro_execucao.py execucao.jsonl [id_da_execucao]')
+    else:
+        resume_arquivo(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
@@ -1,38 +1,71 @@
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import time
+import driver_local
+from registro_execucao import RegistroExecucao
 
-def iniciar_driver():
-    #Inicializa o ChromeDriver com o webdriver_manager.
+URL_PESQUISA = "https://www.google.com.br/"
+
+# Tempo de cada etapa (início do driver, navegação, esperas, envio); como script, grava em execucao.jsonl
+registro = RegistroExecucao(robo='robot1')
+
+def opcoes_headless():
+    #Opções para buscas em lote: sem janela, sem imagens e sem esperar recursos secundários da página.
+    opcoes = webdriver.ChromeOptions()
+    opcoes.add_argument("--headless=new")
+    opcoes.add_argument("--blink-settings=imagesEnabled=false")
+    opcoes.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    opcoes.page_load_strategy = "eager"  # libera o driver.get() no DOMContentLoaded
+    return opcoes
+
+def iniciar_driver(opcoes=None):
+    #Inicializa o ChromeDriver com o driver local (cache/offline; rede só com ROBOS_DRIVER_REDE=1).
     print("Iniciando...\n")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-    return driver
+    return driver_local.inicia_chrome(opcoes, registro)
 
-def realizar_pesquisa(driver, termo):
+def realizar_pesquisa(driver, termo, url=URL_PESQUISA):
     #Realiza a pesquisa no Google usando o termo fornecido
-    driver.get("https://www.google.com.br/")
-
+    inicio = time.perf_counter()
     try:
+        with registro.etapa('navegacao', termo=termo):
+            driver.get(url)
+
         # Espera até o campo de pesquisa estar visível
-        pesquisa = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.NAME, "q"))
-        )
-        pesquisa.send_keys(termo)  # Envia o termo para a pesquisa
-        pesquisa.send_keys(Keys.RETURN)  # Simula pressionamento de Enter
+        with registro.etapa('espera:campo_pesquisa', termo=termo):
+            pesquisa = WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.NAME, "q"))
+            )
+        with registro.etapa('envio:pesquisa', termo=termo):
+            pesquisa.send_keys(termo)  # Envia o termo para a pesquisa
+            pesquisa.send_keys(Keys.RETURN)  # Simula pressionamento de Enter
 
         # Espera os resultados aparecerem
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "search"))
-        )
+        with registro.etapa('espera:resultados', termo=termo):
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.ID, "search"))
+            )
         print(f"Resultados para '{termo}' carregados com sucesso.")
+        registro.resultado(None, 'ok', time.perf_counter() - inicio, termo=termo)
+        return True
 
     except Exception as e:
         print(f"Erro ao realizar a pesquisa: {e}")
+        registro.resultado(None, 'falha', time.perf_counter() - inicio, termo=termo, erro=str(e))
+        return False
+
+def extrair_resultados(driver, limite=10):
+    #Coleta título e URL dos resultados (links com <h3> dentro de #search).
+    resultados = []
+    with registro.etapa('extracao'):
+        for link in driver.find_elements(By.XPATH, "//*[@id='search']//a[.//h3]")[:limite]:
+            resultados.append({
+                "titulo": link.find_element(By.TAG_NAME, "h3").text,
+                "url": link.get_attribute("href"),
+            })
+    return resultados
 
 def manter_navegador_ativo():
     #Mantém o navegador aberto até o usuário pressionar Enter.
@@ -44,6 +77,9 @@ def fechar_driver(driver):
     driver.quit()
 
 if __name__ == "__main__":
+    registro = RegistroExecucao('execucao.jsonl', 'robot1')
+    driver_local.pre_aquecer()  # resolve o driver enquanto o usuário digita o termo
+
     # Solicita ao usuário o termo para pesquisa
     termo_pesquisa = input("O que você gostaria de pesquisar no Google? ")
 
@@ -53,6 +89,7 @@ if __name__ == "__main__":
     try:
         # Realiza a pesquisa no Google
         realizar_pesquisa(driver, termo_pesquisa)
+        registro.imprime_resumo()
 
         # Mantém o navegador aberto até o usuário decidir fechá-lo
         manter_navegador_ativo()
@@ -60,3 +97,4 @@ if __name__ == "__main__":
     finally:
         # Fechar o navegador
         fechar_driver(driver)
+        registro.fecha()
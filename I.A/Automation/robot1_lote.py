@@ -0,0 +1,140 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+
+import driver_local
+import robot1
+from registro_execucao import RegistroExecucao
+
+PAGINA_TESTE = Path(os.path.dirname(os.path.abspath(__file__)), 'pagina_teste', 'busca.html').as_uri()
+
+
+class PoolNavegadores:
+    """Mantém N Chrome headless abertos e reaproveita entre as pesquisas.
+
+    Cada navegador é reciclado (fechado e recriado) depois de `max_usos`
+    pesquisas, o que limita o crescimento de memória do Chrome; um navegador
+    que falhou é descartado na hora.
+    """
+
+    def __init__(self, tamanho=3, max_usos=50):
+        self.max_usos = max_usos
+        self.livres = queue.Queue()
+        self.trava = threading.Lock()
+        self.abertos = []
+        self.reciclados = 0
+        for _ in range(tamanho):
+            self.livres.put(None)  # vaga: o navegador só é aberto quando alguém precisar
+
+    def _abre(self):
+        driver = robot1.iniciar_driver(robot1.opcoes_headless())
+        with self.trava:
+            self.abertos.append(driver)
+        return {'driver': driver, 'usos': 0}
+
+    def _fecha(self, sessao):
+        with self.trava:
+            self.abertos.remove(sessao['driver'])
+        try:
+            sessao['driver'].quit()
+        except Exception:
+            pass
+
+    @contextmanager
+    def navegador(self):
+        sessao = self.livres.get()
+        if sessao is None:
+            try:
+                sessao = self._abre()
+            except Exception:
+                self.livres.put(None)  # devolve a vaga para outra tentativa
+                raise
+        try:
+            yield sessao['driver']
+        except Exception:
+            self._fecha(sessao)
+            self.livres.put(None)
+            raise
+        sessao['usos'] += 1
+        if sessao['usos'] >= self.max_usos:
+            self._fecha(sessao)
+            with self.trava:
+                self.reciclados += 1
+            sessao = None
+        self.livres.put(sessao)
+
+    def fecha_todos(self):
+        with self.trava:
+            abertos, self.abertos = self.abertos, []
+        for driver in abertos:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+def le_termos(caminho):
+    with open(caminho, encoding='utf-8') as arquivo:
+        return [linha.strip() for linha in arquivo if linha.strip() and not linha.startswith('#')]
+
+
+def pesquisa(pool, termo, url):
+    with pool.navegador() as driver:
+        if not robot1.realizar_pesquisa(driver, termo, url):
+            raise RuntimeError(f"pesquisa por '{termo}' falhou")
+        return robot1.extrair_resultados(driver)
+
+
+def executa(termos, saida, tamanho_pool=3, max_usos=50, url=robot1.URL_PESQUISA):
+    pool = PoolNavegadores(tamanho_pool, max_usos)
+    resumo = {'ok': 0, 'falhas': 0}
+    inicio = time.perf_counter()
+    try:
+        with open(saida, 'w', encoding='utf-8') as arquivo, \
+                ThreadPoolExecutor(max_workers=tamanho_pool) as executor:
+            futuros = {executor.submit(pesquisa, pool, termo, url): termo for termo in termos}
+            for futuro in as_completed(futuros):
+                registro = {'termo': futuros[futuro]}
+                try:
+                    registro['resultados'] = futuro.result()
+                    resumo['ok'] += 1
+                except Exception as e:
+                    registro['erro'] = str(e).splitlines()[0] if str(e) else type(e).__name__
+                    resumo['falhas'] += 1
+                arquivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+                arquivo.flush()
+    finally:
+        pool.fecha_todos()
+
+    resumo['segundos'] = round(time.perf_counter() - inicio, 2)
+    resumo['reciclagens'] = pool.reciclados
+    print(f"\n{resumo['ok']} pesquisas ok, {resumo['falhas']} falhas em {resumo['segundos']}s "
+          f"({resumo['reciclagens']} navegadores reciclados). Resultados em {saida}")
+    return resumo
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Pesquisas em lote com um pool de Chrome headless.')
+    parser.add_argument('termos', help='arquivo texto com um termo por linha')
+    parser.add_argument('--saida', default='resultados.jsonl')
+    parser.add_argument('--navegadores', type=int, default=3, help='tamanho do pool')
+    parser.add_argument('--max-usos', type=int, default=50, help='pesquisas por navegador antes de reciclá-lo')
+    parser.add_argument('--url', default=robot1.URL_PESQUISA, help='página de busca (use --teste para a página local)')
+    parser.add_argument('--teste', action='store_true', help='usa pagina_teste/busca.html em vez do Google')
+    parser.add_argument('--log', default='execucao.jsonl')
+    args = parser.parse_args()
+    driver_local.pre_aquecer()
+
+    robot1.registro = RegistroExecucao(args.log, 'robot1-lote')
+    try:
+        executa(le_termos(args.termos), args.saida, args.navegadores, args.max_usos,
+                PAGINA_TESTE if args.teste else args.url)
+        robot1.registro.imprime_resumo()
+    finally:
+        robot1.registro.fecha()
@@ -0,0 +1,226 @@
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fonte_linhas import (CHECKPOINT_PADRAO, PLANILHA, REGISTRO_PADRAO, TAMANHOS, Checkpoint, FonteProdutos,
+                          RegistroEnviados)
+from registro_execucao import RegistroExecucao
+
+URL_PADRAO = 'http://127.0.0.1:8765'
+
+# Rota de cada etapa -> campos do Produto enviados nela (mesma divisão do formulário).
+# O id devolvido pela primeira etapa é repassado às seguintes.
+ETAPAS_HTTP = [
+    ('/cadastro/etapa1', ['nome_produto', 'descricao', 'categoria', 'codigo_produto', 'peso', 'dimensoes']),
+    ('/cadastro/etapa2', ['preco', 'quantidade_estoque', 'data_validade', 'cor', 'tamanho', 'material']),
+    ('/cadastro/etapa3', ['fabricante', 'pais_origem', 'observacoes', 'codigo_barras', 'localizacao_armazem']),
+]
+CAMPO_ID_RASCUNHO = 'rascunho_id'
+TAMANHO_MAXIMO_TEXTO = 255
+
+
+class LimitadorTaxa:
+    """Espaça as requisições de todas as threads para no máximo `por_segundo`."""
+
+    def __init__(self, por_segundo):
+        self.intervalo = 1 / por_segundo if por_segundo else 0
+        self.proximo = time.monotonic()
+        self.trava = threading.Lock()
+
+    def aguarda(self):
+        with self.trava:
+            agora = time.monotonic()
+            espera = max(0.0, self.proximo - agora)
+            self.proximo = max(agora, self.proximo) + self.intervalo
+        if espera:
+            time.sleep(espera)
+
+
+def monta_payloads(produto):
+    return [(rota, {campo: '' if getattr(produto, campo) is None else str(getattr(produto, campo))
+                    for campo in campos})
+            for rota, campos in ETAPAS_HTTP]
+
+
+def valida_payloads(produto):
+    """Problemas que fariam o envio falhar; lista vazia significa que o produto pode ser enviado."""
+    problemas = []
+    for rota, payload in monta_payloads(produto):
+        for campo, valor in payload.items():
+            if len(valor) > TAMANHO_MAXIMO_TEXTO:
+                problemas.append(f'{rota} {campo}: mais de {TAMANHO_MAXIMO_TEXTO} caracteres')
+    if produto.preco < 0:
+        problemas.append('preco negativo')
+    if produto.quantidade_estoque < 0:
+        problemas.append('quantidade_estoque negativa')
+    if produto.tamanho and produto.tamanho not in TAMANHOS:
+        problemas.append(f'tamanho desconhecido {produto.tamanho!r}')
+    return problemas
+
+
+class EnvioHTTP:
+    """Envia os produtos direto para as rotas do cadastro, sem navegador."""
+
+    def __init__(self, url=URL_PADRAO, concorrencia=8, por_segundo=20, tentativas=3, timeout=10,
+                 registro=None, checkpoint=None, log=None):
+        self.log = log or RegistroExecucao(robo='robot2-http')
+        self.url = url.rstrip('/')
+        self.concorrencia = concorrencia
+        self.tentativas = tentativas
+        self.timeout = timeout
+        self.registro = registro or RegistroEnviados()
+        self.checkpoint = checkpoint
+        self.limitador = LimitadorTaxa(por_segundo)
+        # Uma sessão com pool do tamanho da concorrência: as conexões são reaproveitadas (keep-alive)
+        self.sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=concorrencia)
+        self.sessao.mount('http://', adaptador)
+        self.sessao.mount('https://', adaptador)
+        self.trava = threading.Lock()
+        self.resultado = {'ok': 0, 'duplicadas': 0, 'requisicoes': 0, 'falhas': []}
+
+    def _post(self, rota, payload, linha):
+        with self.log.etapa('espera:limite_taxa', linha):
+            self.limitador.aguarda()
+        with self.trava:
+            self.resultado['requisicoes'] += 1
+        with self.log.etapa(f'post:{rota}', linha):
+            resposta = self.sessao.post(self.url + rota, data=payload, timeout=self.timeout)
+        if resposta.status_code >= 500:
+            resposta.raise_for_status()  # erro do servidor: vale tentar de novo
+        return resposta
+
+    def _envia_produto(self, produto, progresso):
+        """Envia as etapas que faltam; `progresso` guarda a etapa e o rascunho entre tentativas,
+        para uma nova tentativa continuar do ponto da falha em vez de abrir outro rascunho."""
+        payloads = monta_payloads(produto)
+        while progresso['etapa'] < len(payloads):
+            rota, payload = payloads[progresso['etapa']]
+            if progresso['id']:
+                payload[CAMPO_ID_RASCUNHO] = progresso['id']
+            resposta = self._post(rota, payload, produto.linha)
+            if resposta.status_code == 409:
+                return 'duplicada'
+            if resposta.status_code >= 400:
+                raise ValueError(f'{rota} respondeu {resposta.status_code}: {resposta.text[:200]}')
+            progresso['id'] = resposta.json().get(CAMPO_ID_RASCUNHO, progresso['id'])
+            progresso['etapa'] += 1
+        return 'ok'
+
+    def _processa(self, produto):
+        codigo = produto.codigo_produto
+        if not self.registro.reserva(codigo):
+            self.log.resultado(produto.linha, 'duplicada', codigo=codigo)
+            return produto, 'duplicada', None
+        erro = None
+        inicio = time.perf_counter()
+        progresso = {'etapa': 0, 'id': None}
+        for tentativa in range(1, self.tentativas + 1):
+            try:
+                situacao = self._envia_produto(produto, progresso)
+                self.registro.confirma(codigo)  # 409 também significa que o produto já existe no destino
+                self.log.resultado(produto.linha, situacao, time.perf_counter() - inicio,
+                                   codigo=codigo, tentativas=tentativa)
+                return produto, situacao, None
+            except ValueError as e:
+                erro = e
+                break  # erro de validação do destino: repetir não adianta
+            except requests.RequestException as e:
+                erro = e
+                time.sleep(0.5 * tentativa)
+            except Exception as e:
+                erro = e
+                break  # erro inesperado: vira falha da linha, sem derrubar a execução
+        self.registro.libera(codigo)
+        self.log.resultado(produto.linha, 'falha', time.perf_counter() - inicio, codigo=codigo,
+                           erro=str(erro), etapa=progresso['etapa'] + 1)
+        return produto, 'falha', erro
+
+    def executa(self, produtos, limite=None):
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concorrencia) as executor:
+            pendentes = set()
+            for indice, produto in enumerate(produtos):
+                if limite is not None and indice >= limite:
+                    break
+                pendentes.add(executor.submit(self._processa, produto))
+                # Mantém poucas tarefas na fila para não ler a planilha inteira de uma vez
+                if len(pendentes) >= self.concorrencia * 4:
+                    pendentes = self._coleta(pendentes, primeira=True)
+            self._coleta(pendentes)
+        if self.checkpoint:
+            self.checkpoint.salva()
+
+        segundos = time.perf_counter() - inicio
+        self.resultado['segundos'] = round(segundos, 2)
+        self.resultado['linhas_por_minuto'] = round(self.resultado['ok'] / segundos * 60, 1) if segundos else 0.0
+        return self.resultado
+
+    def _coleta(self, pendentes, primeira=False):
+        for futuro in as_completed(pendentes):
+            pendentes.discard(futuro)
+            produto, situacao, erro = futuro.result()
+            if situacao == 'falha':
+                self.resultado['falhas'].append({'codigo': produto.codigo_produto, 'linha': produto.linha,
+                                                 'erro': str(erro)})
+                if self.checkpoint:
+                    self.checkpoint.falha(produto.linha)
+            else:
+                self.resultado['ok' if situacao == 'ok' else 'duplicadas'] += 1
+                if self.checkpoint:
+                    self.checkpoint.conclui(produto.linha)
+            if primeira:
+                break
+        return pendentes
+
+
+def valida_planilha(fonte, limite=None):
+    """Modo dry-run: monta e valida todos os payloads sem enviar nada."""
+    validos, problemas = 0, []
+    for indice, produto in enumerate(fonte):
+        if limite is not None and indice >= limite:
+            break
+        erros = valida_payloads(produto)
+        if erros:
+            problemas.append({'linha': produto.linha, 'codigo': produto.codigo_produto, 'erros': erros})
+        else:
+            validos += 1
+    print(f"{validos} produtos prontos para envio, {len(problemas)} com problemas, "
+          f"{len(fonte.invalidas)} linhas inválidas na planilha.")
+    for problema in problemas:
+        print(f"  linha {problema['linha']} ({problema['codigo']}): {'; '.join(problema['erros'])}")
+    return validos, problemas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Envio direto do cadastro por HTTP, sem interface.')
+    parser.add_argument('--url', default=URL_PADRAO, help='endereço base do sistema de cadastro')
+    parser.add_argument('--planilha', default=PLANILHA)
+    parser.add_argument('--concorrencia', type=int, default=8)
+    parser.add_argument('--por-segundo', type=float, default=20, help='limite de requisições por segundo')
+    parser.add_argument('--tentativas', type=int, default=3)
+    parser.add_argument('--limite', type=int, default=None)
+    parser.add_argument('--registro', default=REGISTRO_PADRAO)
+    parser.add_argument('--checkpoint', default=CHECKPOINT_PADRAO)
+    parser.add_argument('--dry-run', action='store_true', help='só valida os payloads, não envia')
+    parser.add_argument('--log', default='execucao.jsonl', help='log JSON lines com o tempo de cada etapa')
+    args = parser.parse_args()
+
+    if args.dry_run:
+        valida_planilha(FonteProdutos(args.planilha), args.limite)
+    else:
+        checkpoint = Checkpoint(args.checkpoint)
+        log = RegistroExecucao(args.log, 'robot2-http')
+        envio = EnvioHTTP(args.url, args.concorrencia, args.por_segundo, args.tentativas,
+                          registro=RegistroEnviados(args.registro), checkpoint=checkpoint, log=log)
+        resultado = envio.executa(FonteProdutos(args.planilha, checkpoint=checkpoint), args.limite)
+        print(f"\n{resultado['ok']} enviados, {resultado['duplicadas']} já existentes, {len(resultado['falhas'])} falhas, "
+              f"{resultado['requisicoes']} requisições em {resultado['segundos']}s -> {resultado['linhas_por_minuto']} linhas/min")
+        for falha in resultado['falhas']:
+            print(f"  FALHA linha {falha['linha']} ({falha['codigo']}): {falha['erro']}")
+        log.imprime_resumo()
+        log.fecha()
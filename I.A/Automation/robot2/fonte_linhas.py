@@ -0,0 +1,286 @@
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+
+import openpyxl
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+PLANILHA = os.path.join(PASTA, 'planilha', 'produtos_ficticios.xlsx')
+CHECKPOINT_PADRAO = os.path.join(PASTA, 'checkpoint.json')
+REGISTRO_PADRAO = os.path.join(PASTA, 'enviados.txt')
+
+# registro_execucao.py e driver_local.py ficam na pasta Automation; os scripts do robot2 importam este módulo antes deles
+if os.path.dirname(PASTA) not in sys.path:
+    sys.path.append(os.path.dirname(PASTA))
+
+
+@dataclass
+class Produto:
+    linha: int
+    nome_produto: str
+    descricao: str
+    categoria: str
+    codigo_produto: str
+    peso: float
+    dimensoes: str
+    preco: float
+    quantidade_estoque: int
+    data_validade: str
+    cor: str
+    tamanho: str
+    material: str
+    fabricante: str
+    pais_origem: str
+    observacoes: str
+    codigo_barras: str
+    localizacao_armazem: str
+
+
+# Cabeçalho da planilha -> campo do Produto
+COLUNAS = {
+    'Nome do produto': 'nome_produto',
+    'Descrição': 'descricao',
+    'Categoria': 'categoria',
+    'Código do produto': 'codigo_produto',
+    'Peso (em kg)': 'peso',
+    'Dimensões (L x A x P)': 'dimensoes',
+    'Preço': 'preco',
+    'Quantidade em estoque': 'quantidade_estoque',
+    'Data de validade': 'data_validade',
+    'Cor': 'cor',
+    'Tamanho': 'tamanho',
+    'Material': 'material',
+    'Fabricante': 'fabricante',
+    'País de origem': 'pais_origem',
+    'Observações': 'observacoes',
+    'Código de barras': 'codigo_barras',
+    'Localização no armazém': 'localizacao_armazem',
+}
+OBRIGATORIOS = {'nome_produto', 'codigo_produto'}
+TAMANHOS = {'Pequeno', 'Médio', 'Grande'}
+
+
+def _texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)  # códigos de barras numéricos chegam como float
+    return str(valor).strip()
+
+def _decimal(valor):
+    if valor in (None, ''):
+        return 0.0
+    if isinstance(valor, str):
+        valor = valor.replace('.', '').replace(',', '.') if ',' in valor else valor
+    return float(valor)
+
+def _inteiro(valor):
+    numero = _decimal(valor)
+    if not numero.is_integer():
+        raise ValueError(f'esperado número inteiro, recebido {valor!r}')
+    return int(numero)
+
+def _data(valor):
+    if valor in (None, ''):
+        return ''
+    if isinstance(valor, (datetime, date)):
+        return valor.strftime('%Y-%m-%d')
+    texto = str(valor).strip()
+    for formato in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(texto, formato).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    raise ValueError(f'data inválida {valor!r}')
+
+CONVERSORES = {'peso': _decimal, 'preco': _decimal, 'quantidade_estoque': _inteiro, 'data_validade': _data}
+
+
+def normaliza(numero_linha, registro):
+    """Converte um dict {cabeçalho: valor} em Produto, levantando ValueError se for inválido."""
+    valores = {'linha': numero_linha}
+    for cabecalho, campo in COLUNAS.items():
+        bruto = registro.get(cabecalho)
+        try:
+            valores[campo] = CONVERSORES.get(campo, _texto)(bruto)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f'{cabecalho}: {e}') from None
+    faltando = [campo for campo in OBRIGATORIOS if not valores[campo]]
+    if faltando:
+        raise ValueError(f"campos obrigatórios vazios: {', '.join(faltando)}")
+    if valores['tamanho'] and valores['tamanho'] not in TAMANHOS:
+        raise ValueError(f"tamanho desconhecido {valores['tamanho']!r}")
+    return Produto(**valores)
+
+
+class Checkpoint:
+    """Guarda em disco quais linhas já foram concluídas.
+
+    Com envios em paralelo as linhas terminam fora de ordem; o arquivo guarda a
+    primeira linha ainda pendente, as concluídas depois dela (no máximo o
+    número de envios em andamento) e as que falharam. Linhas com falha não
+    seguram o avanço: ficam em `falhas` e são tentadas de novo na próxima
+    execução, então o tamanho só cresce com as falhas, não com a planilha.
+
+    A gravação é espaçada em `intervalo` segundos; chame salva() no fim. Com
+    intervalo=0 cada linha é gravada na hora (o robô de sessão única usa assim).
+    """
+
+    def __init__(self, caminho=CHECKPOINT_PADRAO, primeira_linha=2, intervalo=1.0):
+        self.caminho = caminho
+        self.proxima = primeira_linha
+        self.adiantadas = set()
+        self.falhas = set()
+        self.intervalo = intervalo
+        self.ultima_gravacao = 0.0
+        self.pendente = False
+        self.trava = threading.Lock()  # várias sessões concluem linhas ao mesmo tempo
+        if os.path.exists(caminho):
+            with open(caminho, encoding='utf-8') as arquivo:
+                dados = json.load(arquivo)
+            self.proxima = dados['proxima']
+            self.adiantadas = set(dados.get('adiantadas', []))
+            self.falhas = set(dados.get('falhas', []))
+
+    def ja_concluida(self, numero_linha):
+        if numero_linha in self.falhas:
+            return False
+        return numero_linha < self.proxima or numero_linha in self.adiantadas
+
+    def _avanca(self, numero_linha):
+        if numero_linha >= self.proxima:  # uma falha antiga refeita já está atrás da próxima
+            self.adiantadas.add(numero_linha)
+        while self.proxima in self.adiantadas:
+            self.adiantadas.remove(self.proxima)
+            self.proxima += 1
+        self.pendente = True
+        if time.monotonic() - self.ultima_gravacao >= self.intervalo:
+            self._salva()
+
+    def conclui(self, numero_linha):
+        with self.trava:
+            self.falhas.discard(numero_linha)
+            self._avanca(numero_linha)
+
+    def falha(self, numero_linha):
+        """Linha que não pôde ser enviada: o checkpoint passa por ela, mas a próxima execução a refaz."""
+        with self.trava:
+            self.falhas.add(numero_linha)
+            self._avanca(numero_linha)
+
+    def pula(self, numero_linha):
+        """Linhas vazias ou inválidas também avançam o checkpoint (as inválidas já foram relatadas)."""
+        self.conclui(numero_linha)
+
+    def salva(self):
+        with self.trava:
+            if self.pendente:
+                self._salva()
+
+    def _salva(self):
+        # Grava num arquivo temporário e troca: uma interrupção nunca deixa o JSON pela metade
+        temporario = self.caminho + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump({'proxima': self.proxima, 'adiantadas': sorted(self.adiantadas),
+                       'falhas': sorted(self.falhas)}, arquivo)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, self.caminho)
+        self.ultima_gravacao = time.monotonic()
+        self.pendente = False
+
+    def apaga(self):
+        if os.path.exists(self.caminho):
+            os.remove(self.caminho)
+
+
+class RegistroEnviados:
+    """Lista durável dos códigos já cadastrados, compartilhada entre as sessões.
+
+    Um código é reservado antes do envio e só vai para o arquivo depois da
+    confirmação; assim nenhuma linha é enviada duas vezes, nem na mesma
+    execução (planilha com código repetido) nem ao rodar de novo.
+    """
+
+    def __init__(self, caminho=REGISTRO_PADRAO):
+        self.caminho = caminho
+        self.trava = threading.Lock()
+        self.em_andamento = set()
+        self.enviados = set()
+        if os.path.exists(caminho):
+            with open(caminho, encoding='utf-8') as arquivo:
+                self.enviados = {linha.strip() for linha in arquivo if linha.strip()}
+
+    def reserva(self, codigo):
+        with self.trava:
+            if codigo in self.enviados or codigo in self.em_andamento:
+                return False
+            self.em_andamento.add(codigo)
+            return True
+
+    def confirma(self, codigo):
+        with self.trava:
+            with open(self.caminho, 'a', encoding='utf-8') as arquivo:
+                arquivo.write(codigo + '\n')
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            self.em_andamento.discard(codigo)
+            self.enviados.add(codigo)
+
+    def libera(self, codigo):
+        with self.trava:
+            self.em_andamento.discard(codigo)
+
+
+class FonteProdutos:
+    """Lê produtos de .xlsx (modo read_only) ou .csv sem carregar o arquivo inteiro.
+
+    Linhas já concluídas segundo o checkpoint são puladas; linhas inválidas são
+    relatadas em `invalidas` e não chegam ao robô.
+    """
+
+    def __init__(self, caminho=PLANILHA, aba='Produtos', checkpoint=None):
+        self.caminho = caminho
+        self.aba = aba
+        self.checkpoint = checkpoint
+        self.invalidas = []
+
+    def _registros_xlsx(self):
+        workbook = openpyxl.load_workbook(self.caminho, read_only=True, data_only=True)
+        try:
+            linhas = workbook[self.aba].iter_rows(values_only=True)
+            cabecalho = next(linhas)
+            for numero, linha in enumerate(linhas, start=2):
+                yield numero, dict(zip(cabecalho, linha))
+        finally:
+            workbook.close()
+
+    def _registros_csv(self):
+        with open(self.caminho, encoding='utf-8-sig', newline='') as arquivo:
+            for numero, registro in enumerate(csv.DictReader(arquivo), start=2):
+                yield numero, registro
+
+    def __iter__(self):
+        if self.caminho.lower().endswith('.csv'):
+            registros = self._registros_csv()
+        else:
+            registros = self._registros_xlsx()
+        for numero, registro in registros:
+            if self.checkpoint and self.checkpoint.ja_concluida(numero):
+                continue
+            if not any(valor not in (None, '') for valor in registro.values()):
+                if self.checkpoint:
+                    self.checkpoint.pula(numero)  # linha vazia não pode travar o checkpoint
+                continue
+            try:
+                yield normaliza(numero, registro)
+            except ValueError as e:
+                print(f"Linha {numero} ignorada: {e}")
+                self.invalidas.append({'linha': numero, 'erro': str(e)})
+                if self.checkpoint:
+                    self.checkpoint.pula(numero)
@@ -0,0 +1,184 @@
+import argparse
+import time
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import Select, WebDriverWait
+
+from fonte_linhas import CHECKPOINT_PADRAO, PASTA, PLANILHA, Checkpoint, FonteProdutos
+import driver_local
+from registro_execucao import RegistroExecucao
+
+FORMULARIO_LOCAL = Path(PASTA, 'formulario_local', 'index.html').as_uri()
+
+# Campo do Produto -> seletor CSS do campo, etapa por etapa.
+# 'proximo' é o botão que leva à etapa seguinte.
+ETAPAS = [
+    {
+        'campos': {
+            'nome_produto': '#nome_produto',
+            'descricao': '#descricao',
+            'categoria': '#categoria',
+            'codigo_produto': '#codigo_produto',
+            'peso': '#peso',
+            'dimensoes': '#dimensoes',
+        },
+        'proximo': '#proximo-1',
+    },
+    {
+        'campos': {
+            'preco': '#preco',
+            'quantidade_estoque': '#quantidade_estoque',
+            'data_validade': '#data_validade',
+            'cor': '#cor',
+            'tamanho': '#tamanho',
+            'material': '#material',
+        },
+        'proximo': '#proximo-2',
+    },
+    {
+        'campos': {
+            'fabricante': '#fabricante',
+            'pais_origem': '#pais_origem',
+            'observacoes': '#observacoes',
+            'codigo_barras': '#codigo_barras',
+            'localizacao_armazem': '#localizacao_armazem',
+        },
+        'proximo': '#concluir',
+    },
+]
+BOTAO_CONFIRMAR = '#confirmar'
+BOTAO_NOVO_CADASTRO = '#novo-cadastro'
+
+# Custo fixo por linha do main.py (pyautogui): 25 cliques com duration=1 e 3 sleep(5)
+SEGUNDOS_POR_LINHA_PYAUTOGUI = 25 * 1 + 3 * 5
+
+# Atribui o valor direto no campo e dispara os eventos que frameworks de front-end escutam
+JS_PREENCHE = """
+arguments[0].value = arguments[1];
+arguments[0].dispatchEvent(new Event('input', {bubbles: true}));
+arguments[0].dispatchEvent(new Event('change', {bubbles: true}));
+"""
+
+
+def cria_driver(headless=False, registro=None):
+    opcoes = webdriver.ChromeOptions()
+    if headless:
+        opcoes.add_argument('--headless=new')
+    opcoes.add_argument('--window-size=1280,1024')
+    return driver_local.inicia_chrome(opcoes, registro)
+
+
+class PreenchedorFormulario:
+    """Preenche o cadastro em etapas por seletores, esperando cada etapa ficar pronta."""
+
+    def __init__(self, driver, url=FORMULARIO_LOCAL, etapas=ETAPAS, timeout=10, registro=None):
+        self.driver = driver
+        self.url = url
+        self.etapas = etapas
+        self.espera = WebDriverWait(driver, timeout)
+        self.registro = registro or RegistroExecucao(robo='robot2')
+        self.linha = None  # linha da planilha em andamento, para o log
+        self.enviado = False  # se o cadastro da linha atual já foi enviado (clique em confirmar)
+
+    def abre(self):
+        with self.registro.etapa('navegacao', self.linha):
+            self.driver.get(self.url)
+        self._aguarda_etapa(0)
+
+    def _aguarda_etapa(self, indice):
+        primeiro = next(iter(self.etapas[indice]['campos'].values()))
+        with self.registro.etapa(f'espera:etapa{indice + 1}', self.linha):
+            self.espera.until(EC.element_to_be_clickable((By.CSS_SELECTOR, primeiro)))
+
+    def _clica(self, seletor, envio=False):
+        with self.registro.etapa(f'clique:{seletor}', self.linha):
+            elemento = self.espera.until(EC.element_to_be_clickable((By.CSS_SELECTOR, seletor)))
+            if envio:
+                # Só depois da espera: se o botão nunca ficou clicável, nada foi enviado
+                self.enviado = True
+            elemento.click()
+
+    def _preenche_campo(self, campo, seletor, valor):
+        with self.registro.etapa(f'preenche:{campo}', self.linha):
+            elemento = self.driver.find_element(By.CSS_SELECTOR, seletor)
+            texto = '' if valor is None else str(valor)
+            if elemento.tag_name == 'select':
+                Select(elemento).select_by_visible_text(texto)
+            else:
+                self.driver.execute_script(JS_PREENCHE, elemento, texto)
+
+    def preenche_linha(self, produto):
+        self.linha = produto.linha
+        self.enviado = False
+        for indice, etapa in enumerate(self.etapas):
+            if indice:
+                self._aguarda_etapa(indice)
+            for campo, seletor in etapa['campos'].items():
+                self._preenche_campo(campo, seletor, getattr(produto, campo))
+            self._clica(etapa['proximo'])
+        # A partir do clique no confirmar o produto pode já ter sido enviado: falhas depois disso não devem reenviar
+        self._clica(BOTAO_CONFIRMAR, envio=True)
+        self._clica(BOTAO_NOVO_CADASTRO)
+        self._aguarda_etapa(0)
+
+
+def executa(url=FORMULARIO_LOCAL, planilha=PLANILHA, limite=None, headless=False, checkpoint=None, registro=None):
+    # Sem RegistroEnviados nesta sessão única, o checkpoint é gravado a cada linha: depois de uma queda
+    # (mesmo um SIGKILL) nenhuma linha já enviada volta a ser enviada
+    checkpoint = checkpoint or Checkpoint(intervalo=0)
+    registro = registro or RegistroExecucao(robo='robot2')
+    inicio = time.perf_counter()
+    driver = cria_driver(headless, registro)
+    preenchedor = PreenchedorFormulario(driver, url, registro=registro)
+    enviados = 0
+    try:
+        preenchedor.abre()
+        for produto in FonteProdutos(planilha, checkpoint=checkpoint):
+            if limite is not None and enviados >= limite:
+                break
+            inicio_linha = time.perf_counter()
+            try:
+                preenchedor.preenche_linha(produto)
+            except Exception as e:
+                # Erro depois do confirmar: o cadastro pode ter sido enviado, então a linha não é refeita
+                (checkpoint.conclui if preenchedor.enviado else checkpoint.falha)(produto.linha)
+                registro.resultado(produto.linha, 'incerta' if preenchedor.enviado else 'falha',
+                                   time.perf_counter() - inicio_linha, codigo=produto.codigo_produto,
+                                   erro=str(e).splitlines()[0] if str(e) else type(e).__name__)
+                raise
+            checkpoint.conclui(produto.linha)
+            registro.resultado(produto.linha, 'ok', time.perf_counter() - inicio_linha, codigo=produto.codigo_produto)
+            enviados += 1
+            print(f"Produto {produto.codigo_produto} (linha {produto.linha}) cadastrado.")
+    finally:
+        checkpoint.salva()
+        driver.quit()
+        registro.imprime_resumo()
+        registro.fecha()
+
+    segundos = time.perf_counter() - inicio
+    por_minuto = enviados / segundos * 60 if segundos else 0
+    print(f"\n{enviados} linhas em {segundos:.1f}s -> {por_minuto:.1f} linhas/min "
+          f"(pyautogui: {60 / SEGUNDOS_POR_LINHA_PYAUTOGUI:.1f} linhas/min só em cliques e esperas fixas)")
+    return enviados, segundos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Cadastro de produtos por seletores (Selenium).')
+    parser.add_argument('--url', default=FORMULARIO_LOCAL, help='endereço do formulário (padrão: réplica local)')
+    parser.add_argument('--planilha', default=PLANILHA)
+    parser.add_argument('--limite', type=int, default=None, help='número máximo de linhas')
+    parser.add_argument('--headless', action='store_true')
+    parser.add_argument('--checkpoint', default=CHECKPOINT_PADRAO, help='arquivo com o progresso da execução')
+    parser.add_argument('--reiniciar', action='store_true', help='ignora o checkpoint e começa da linha 2')
+    parser.add_argument('--log', default='execucao.jsonl', help='log JSON lines com o tempo de cada etapa')
+    args = parser.parse_args()
+    driver_local.pre_aquecer()  # resolve o driver enquanto a planilha e o checkpoint são abertos
+    checkpoint = Checkpoint(args.checkpoint, intervalo=0)
+    if args.reiniciar:
+        checkpoint.apaga()
+        checkpoint = Checkpoint(args.checkpoint, intervalo=0)
+    executa(args.url, args.planilha, args.limite, args.headless, checkpoint, RegistroExecucao(args.log, 'robot2'))
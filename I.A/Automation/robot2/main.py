@@ -1,142 +1,107 @@
+import time
 import openpyxl
 import pyautogui
 from time import sleep
 import pyperclip
 
+from fonte_linhas import PLANILHA
+from registro_execucao import RegistroExecucao
+
+# tempo de cada clique, colagem e espera vai para execucao.jsonl
+registro = RegistroExecucao('execucao.jsonl', 'robot2-pyautogui')
+
+def cola_no_campo(nome, valor, x, y, linha):
+    #copiar informações de um campo e colar no seu campo correspondente
+    with registro.etapa(f'preenche:{nome}', linha):
+        pyperclip.copy(valor)
+        pyautogui.click(x, y, duration=1)
+        pyautogui.hotkey('ctrl', 'v')
+
+def clica(nome, x, y, linha, espera=0):
+    with registro.etapa(f'clique:{nome}', linha):
+        pyautogui.click(x, y, duration=1)
+    if espera:
+        with registro.etapa(f'espera:{nome}', linha):
+            sleep(espera)
+
 #entrar na planilha
-workbook = openpyxl.load_workbook('./planilha/produtos_ficticios.xlsx')
-sheet_produtos = workbook['Produtos']
-
-#copiar informações de um campo e colar no seu campo correspondente
-for linha in sheet_produtos.iter_rows(min_row=2):
-    # Nome do Produto
-    nome_produto = linha[0].value
-    pyperclip.copy(nome_produto)
-    pyautogui.click(1234,299,duration=1)
-    pyautogui.hotkey('ctrl','v')
-
-    # Descrição
-    descricao = linha[1].value
-    pyperclip.copy(descricao)
-    pyautogui.click(1160,416,duration=1)
-    pyautogui.hotkey('ctrl','v')
-    
-    # Categoria
-    categoria = linha[2].value
-    pyperclip.copy(categoria)
-    pyautogui.click(1195,575,duration=1)
-    pyautogui.hotkey('ctrl','v')
-
-    # Codigo Produto
-    codigo_produto = linha[3].value
-    pyperclip.copy(codigo_produto)
-    pyautogui.click(1158,682,duration=1)
-    pyautogui.hotkey('ctrl','v')
-
-    # Peso
-    peso = linha[4].value
-    pyperclip.copy(peso)
-    pyautogui.click(1175,798,duration=1)
-    pyautogui.hotkey('ctrl','v')
-
-    # Dimensões
-    dimensoes = linha[5].value
-    pyperclip.copy(dimensoes)
-    pyautogui.click(1197,897,duration=1)
-    pyautogui.hotkey('ctrl','v')
-
-    # Botão próximo
-    pyautogui.click(1171,970,duration=1)
-    sleep(5)
-
-    # Preço
-    preco = linha[6].value
-    pyperclip.copy(preco)
-    pyautogui.click(1216,329,duration=1)
-    pyautogui.hotkey('ctrl','v')
-
-    # Quantidade em estoque
-    quantidade_em_estoque = linha[7].value
-    pyperclip.copy(quantidade_em_estoque)
-    pyautogui.click(1247,443,duration=1)
-    pyautogui.hotkey('ctrl','v')
-
-    # Data de validade
-    data_de_validade = linha[8].value
-    pyperclip.copy(data_de_validade)
-    pyautogui.click(1227,547,duration=1)
-    pyautogui.hotkey('ctrl','v')
-    
-    # Cor
-    cor = linha[9].value
-    pyperclip.copy(cor)
-    pyautogui.click(1230,648,duration=1)
-    pyautogui.hotkey('ctrl','v')
-
-    # Tamanho
-    tamanho = linha[10].value
-    pyautogui.click(1246,758,duration=1)
-    if tamanho == 'Pequeno':
-        pyautogui.click(1241,814,duration=1)
-    elif tamanho == 'Médio':
-        pyautogui.click(1217,853,duration=1)
-    else:
-        pyautogui.click(1204,881,duration=1)
-
-    # material    
-    material = linha[11].value
-    pyperclip.copy(material)
-    pyautogui.click(1220,860,duration=1)
-    pyautogui.hotkey('ctrl','v')
-    
-    # Botão próximo
-    pyautogui.click(1311,870,duration=1)
-    sleep(5)
-    
-    # material    
-    material = linha[11].value
-    pyperclip.copy(material)
-    pyautogui.click(1482,753,duration=1)
-    pyautogui.hotkey('ctrl','v')
-    
-    # Botão próximo
-    pyautogui.click(1173,941,duration=1)
-    sleep(5)
-    
-    #Fabricante
-    fabricante = linha[12].value
-    pyperclip.copy(fabricante)
-    pyautogui.click(1398,360,duration=1)
-    pyautogui.hotkey('ctrl','v')
-
-    #Pais de origem
-    pais_origem = linha[13].value
-    pyperclip.copy(pais_origem)
-    pyautogui.click(1266,469,duration=1)
-    pyautogui.hotkey('ctrl','v')
-
-    #Observações
-    observacoes = linha[14].value
-    pyperclip.copy(observacoes)
-    pyautogui.click(1238,587,duration=1)
-    pyautogui.hotkey('ctrl','v')
-
-    # Codigo de barras
-    codigo_de_barras = linha[15].value
-    pyperclip.copy(codigo_de_barras)
-    pyautogui.click(1281,738,duration=1)
-    pyautogui.hotkey('ctrl','v')
-    
-    # Localização armazem
-    localizacao_armazem = linha[16].value
-    pyperclip.copy(localizacao_armazem)
-    pyautogui.click(1232,841,duration=1)
-    pyautogui.hotkey('ctrl','v')
-
-    # Botão concluir
-    pyautogui.click(1185,920,duration=1)
-    # Botão confirmar inclusão
-    pyautogui.click(1643,232,duration=1)
-    # iniciar cadastro novamente
-    pyautogui.click(1442,631,duration=1)
-    break #excluir o break caso queira completar a planilha
\ No newline at end of file
+with registro.etapa('abre_planilha'):
+    workbook = openpyxl.load_workbook(PLANILHA)
+    sheet_produtos = workbook['Produtos']
+
+for numero, linha in enumerate(sheet_produtos.iter_rows(min_row=2), start=2):
+    inicio_linha = time.perf_counter()
+    try:
+        # Nome do Produto
+        cola_no_campo('nome_produto', linha[0].value, 1234, 299, numero)
+        # Descrição
+        cola_no_campo('descricao', linha[1].value, 1160, 416, numero)
+        # Categoria
+        cola_no_campo('categoria', linha[2].value, 1195, 575, numero)
+        # Codigo Produto
+        cola_no_campo('codigo_produto', linha[3].value, 1158, 682, numero)
+        # Peso
+        cola_no_campo('peso', linha[4].value, 1175, 798, numero)
+        # Dimensões
+        cola_no_campo('dimensoes', linha[5].value, 1197, 897, numero)
+
+        # Botão próximo
+        clica('proximo_1', 1171, 970, numero, espera=5)
+
+        # Preço
+        cola_no_campo('preco', linha[6].value, 1216, 329, numero)
+        # Quantidade em estoque
+        cola_no_campo('quantidade_estoque', linha[7].value, 1247, 443, numero)
+        # Data de validade
+        cola_no_campo('data_validade', linha[8].value, 1227, 547, numero)
+        # Cor
+        cola_no_campo('cor', linha[9].value, 1230, 648, numero)
+
+        # Tamanho
+        tamanho = linha[10].value
+        with registro.etapa('preenche:tamanho', numero):
+            pyautogui.click(1246,758,duration=1)
+            if tamanho == 'Pequeno':
+                pyautogui.click(1241,814,duration=1)
+            elif tamanho == 'Médio':
+                pyautogui.click(1217,853,duration=1)
+            else:
+                pyautogui.click(1204,881,duration=1)
+
+        # material
+        cola_no_campo('material', linha[11].value, 1220, 860, numero)
+
+        # Botão próximo
+        clica('proximo_2', 1311, 870, numero, espera=5)
+
+        # material
+        cola_no_campo('material_confirmacao', linha[11].value, 1482, 753, numero)
+
+        # Botão próximo
+        clica('proximo_3', 1173, 941, numero, espera=5)
+
+        #Fabricante
+        cola_no_campo('fabricante', linha[12].value, 1398, 360, numero)
+        #Pais de origem
+        cola_no_campo('pais_origem', linha[13].value, 1266, 469, numero)
+        #Observações
+        cola_no_campo('observacoes', linha[14].value, 1238, 587, numero)
+        # Codigo de barras
+        cola_no_campo('codigo_barras', linha[15].value, 1281, 738, numero)
+        # Localização armazem
+        cola_no_campo('localizacao_armazem', linha[16].value, 1232, 841, numero)
+
+        # Botão concluir
+        clica('concluir', 1185, 920, numero)
+        # Botão confirmar inclusão
+        clica('confirmar', 1643, 232, numero)
+        # iniciar cadastro novamente
+        clica('novo_cadastro', 1442, 631, numero)
+        registro.resultado(numero, 'ok', time.perf_counter() - inicio_linha, codigo=linha[3].value)
+    except Exception as e:
+        registro.resultado(numero, 'falha', time.perf_counter() - inicio_linha, codigo=linha[3].value, erro=str(e))
+        raise
+    break #excluir o break caso queira completar a planilha
+
+registro.imprime_resumo()
+registro.fecha()
@@ -0,0 +1,255 @@
+import argparse
+import queue
+import threading
+import time
+
+from fonte_linhas import CHECKPOINT_PADRAO, REGISTRO_PADRAO, Checkpoint, FonteProdutos, RegistroEnviados
+import driver_local
+from formulario import FORMULARIO_LOCAL, PLANILHA, PreenchedorFormulario, cria_driver
+from registro_execucao import RegistroExecucao
+
+
+class SessoesEncerradas(RuntimeError):
+    """Todas as sessões do navegador morreram antes do fim da fila."""
+
+
+class MotorParalelo:
+    """N sessões headless consumindo linhas de uma fila compartilhada."""
+
+    def __init__(self, sessoes=4, url=FORMULARIO_LOCAL, tentativas=3, registro=None, headless=True, checkpoint=None,
+                 log=None):
+        self.sessoes = sessoes
+        self.checkpoint = checkpoint
+        self.log = log or RegistroExecucao(robo='robot2-paralelo')
+        self.url = url
+        self.tentativas = tentativas
+        self.registro = registro or RegistroEnviados()
+        self.headless = headless
+        # Fila limitada: a planilha é lida conforme as sessões consomem
+        self.fila = queue.Queue(maxsize=sessoes * 4)
+        self.trava = threading.Lock()
+        # incertas: erro depois do clique no confirmar; não são reenviadas, mas vale conferir no sistema
+        self.resultado = {'ok': 0, 'duplicadas': 0, 'incertas': [], 'falhas': [], 'por_sessao': {}}
+
+    def _por_sessao(self, sessao):
+        return self.resultado['por_sessao'].setdefault(sessao, {'ok': 0, 'duplicadas': 0, 'incertas': 0, 'falhas': 0})
+
+    def _conta(self, chave, sessao):
+        with self.trava:
+            self.resultado[chave] += 1
+            self._por_sessao(sessao)[chave] += 1
+
+    def _anota(self, chave, sessao, codigo, erro):
+        with self.trava:
+            texto = str(erro).splitlines()[0] if str(erro) else type(erro).__name__
+            self.resultado[chave].append({'codigo': codigo, 'sessao': sessao, 'erro': texto})
+            self._por_sessao(sessao)[chave] += 1
+
+    def _falha(self, sessao, codigo, erro):
+        self._anota('falhas', sessao, codigo, erro)
+
+    def _conclui(self, produto, falhou=False):
+        # Linhas que falharam ficam em checkpoint.falhas: a próxima execução tenta de novo
+        if self.checkpoint:
+            (self.checkpoint.falha if falhou else self.checkpoint.conclui)(produto.linha)
+
+    def _abre_sessao(self):
+        driver = cria_driver(self.headless, self.log)
+        preenchedor = PreenchedorFormulario(driver, self.url, registro=self.log)
+        preenchedor.abre()
+        return driver, preenchedor
+
+    def _recupera(self, navegador, sessao):
+        """Volta ao início do formulário; se o navegador morreu, abre outro. False se não conseguir."""
+        try:
+            navegador['preenchedor'].abre()
+            return True
+        except Exception:
+            pass
+        try:
+            navegador['driver'].quit()
+        except Exception:
+            pass
+        navegador['driver'] = None
+        try:
+            navegador['driver'], navegador['preenchedor'] = self._abre_sessao()
+            return True
+        except Exception as e:
+            print(f"[sessão {sessao}] não foi possível reabrir o navegador: {e}")
+            return False
+
+    def _processa(self, navegador, sessao, produto):
+        """Cadastra uma linha; devolve False se a sessão não tem mais navegador utilizável."""
+        codigo = produto.codigo_produto
+        inicio_linha = time.perf_counter()
+        for tentativa in range(1, self.tentativas + 1):
+            preenchedor = navegador['preenchedor']
+            try:
+                preenchedor.preenche_linha(produto)
+                erro = None
+            except Exception as e:
+                erro = e
+
+            if erro is None or preenchedor.enviado:
+                # Enviado: mesmo que algo falhe depois do confirmar, a linha não é enviada de novo
+                self.registro.confirma(codigo)
+                self._conclui(produto)
+                if erro is None:
+                    self._conta('ok', sessao)
+                    self.log.resultado(produto.linha, 'ok', time.perf_counter() - inicio_linha,
+                                       codigo=codigo, sessao=sessao, tentativas=tentativa)
+                    return True
+                self._anota('incertas', sessao, codigo, erro)
+                self.log.resultado(produto.linha, 'incerta', time.perf_counter() - inicio_linha, codigo=codigo,
+                                   sessao=sessao, tentativas=tentativa,
+                                   erro=str(erro).splitlines()[0] if str(erro) else type(erro).__name__)
+                return self._recupera(navegador, sessao)
+
+            print(f"[sessão {sessao}] {codigo}: tentativa {tentativa} falhou ({type(erro).__name__})")
+            # Recomeça o cadastro do zero (nada foi enviado ainda); se o navegador morreu, abre outro
+            recuperado = tentativa < self.tentativas and self._recupera(navegador, sessao)
+            if not recuperado:
+                self.registro.libera(codigo)
+                self._falha(sessao, codigo, erro)
+                self._conclui(produto, falhou=True)
+                self.log.resultado(produto.linha, 'falha', time.perf_counter() - inicio_linha,
+                                   codigo=codigo, sessao=sessao, tentativas=tentativa)
+                return tentativa == self.tentativas and self._recupera(navegador, sessao)
+        return True
+
+    def _trabalhador(self, sessao):
+        navegador = {'driver': None, 'preenchedor': None}
+        try:
+            navegador['driver'], navegador['preenchedor'] = self._abre_sessao()
+        except Exception as e:
+            print(f"[sessão {sessao}] não foi possível abrir o navegador: {e}")
+            return
+        try:
+            while True:
+                produto = self.fila.get()
+                if produto is None:
+                    break
+                codigo = produto.codigo_produto
+                if not self.registro.reserva(codigo):
+                    self._conta('duplicadas', sessao)
+                    self._conclui(produto)
+                    self.log.resultado(produto.linha, 'duplicada', codigo=codigo, sessao=sessao)
+                    continue
+                if not self._processa(navegador, sessao, produto):
+                    break  # sem navegador: as outras sessões continuam com a fila
+        finally:
+            if navegador['driver'] is not None:
+                try:
+                    navegador['driver'].quit()
+                except Exception:
+                    pass
+
+    def _enfileira(self, item, threads):
+        # Não bloqueia para sempre se todas as sessões morreram
+        while True:
+            try:
+                self.fila.put(item, timeout=1)
+                return
+            except queue.Full:
+                if not any(thread.is_alive() for thread in threads):
+                    raise SessoesEncerradas('Nenhuma sessão do navegador está ativa.')
+
+    def _descarta_fila(self):
+        """Tira da fila as linhas que nenhuma sessão vai processar e as conta como falhas."""
+        while True:
+            try:
+                produto = self.fila.get_nowait()
+            except queue.Empty:
+                return
+            if produto is None:
+                continue
+            with self.trava:
+                self.resultado['falhas'].append({'codigo': produto.codigo_produto, 'sessao': None,
+                                                 'erro': 'não processada: as sessões foram encerradas'})
+            self._conclui(produto, falhou=True)
+            self.log.resultado(produto.linha, 'falha', codigo=produto.codigo_produto, erro='nao_processada')
+
+    def executa(self, produtos, limite=None):
+        inicio = time.perf_counter()
+        threads = [threading.Thread(target=self._trabalhador, args=(i + 1,), daemon=True)
+                   for i in range(self.sessoes)]
+        for thread in threads:
+            thread.start()
+
+        enfileirou_tudo = False
+        try:
+            for indice, produto in enumerate(produtos):
+                if limite is not None and indice >= limite:
+                    break
+                self._enfileira(produto, threads)
+            for _ in threads:
+                self._enfileira(None, threads)
+            enfileirou_tudo = True
+        except SessoesEncerradas as e:
+            print(f"Execução interrompida: {e}")
+            self.resultado['interrompida'] = str(e)
+        finally:
+            if not enfileirou_tudo:
+                # Interrompida: as sessões ainda vivas terminam a linha atual e param
+                self._descarta_fila()
+                for thread in threads:
+                    if thread.is_alive():
+                        try:
+                            self._enfileira(None, threads)
+                        except SessoesEncerradas:
+                            break
+            for thread in threads:
+                thread.join()
+            self._descarta_fila()
+            if self.checkpoint:
+                self.checkpoint.salva()
+
+        segundos = time.perf_counter() - inicio
+        self.resultado['segundos'] = round(segundos, 2)
+        self.resultado['linhas_por_minuto'] = round(self.resultado['ok'] / segundos * 60, 1) if segundos else 0.0
+        return self.resultado
+
+
+def imprime_relatorio(resultado):
+    print(f"\n{resultado['ok']} cadastradas, {resultado['duplicadas']} ignoradas (já enviadas), "
+          f"{len(resultado['incertas'])} incertas, {len(resultado['falhas'])} falhas em {resultado['segundos']}s "
+          f"-> {resultado['linhas_por_minuto']} linhas/min")
+    for sessao, contagem in sorted(resultado['por_sessao'].items()):
+        print(f"  sessão {sessao}: {contagem}")
+    for incerta in resultado['incertas']:
+        print(f"  INCERTA {incerta['codigo']} (sessão {incerta['sessao']}): erro depois do confirmar, "
+              f"confira no sistema: {incerta['erro']}")
+    for falha in resultado['falhas']:
+        print(f"  FALHA {falha['codigo']} (sessão {falha['sessao'] or '-'}): {falha['erro']}")
+    if resultado.get('interrompida'):
+        print(f"  INTERROMPIDA: {resultado['interrompida']}")
+    for invalida in resultado.get('invalidas', []):
+        print(f"  INVÁLIDA linha {invalida['linha']}: {invalida['erro']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Cadastro paralelo com várias sessões headless.')
+    parser.add_argument('--sessoes', type=int, default=4)
+    parser.add_argument('--url', default=FORMULARIO_LOCAL)
+    parser.add_argument('--planilha', default=PLANILHA)
+    parser.add_argument('--tentativas', type=int, default=3)
+    parser.add_argument('--registro', default=REGISTRO_PADRAO, help='arquivo com os códigos já enviados')
+    parser.add_argument('--limite', type=int, default=None)
+    parser.add_argument('--checkpoint', default=CHECKPOINT_PADRAO, help='arquivo com o progresso da execução')
+    parser.add_argument('--reiniciar', action='store_true', help='ignora o checkpoint e começa da linha 2')
+    parser.add_argument('--log', default='execucao.jsonl', help='log JSON lines com o tempo de cada etapa')
+    args = parser.parse_args()
+    driver_local.pre_aquecer()
+
+    if args.reiniciar:
+        Checkpoint(args.checkpoint).apaga()
+    checkpoint = Checkpoint(args.checkpoint)
+    fonte = FonteProdutos(args.planilha, checkpoint=checkpoint)
+    log = RegistroExecucao(args.log, 'robot2-paralelo')
+    motor = MotorParalelo(args.sessoes, args.url, args.tentativas, RegistroEnviados(args.registro), checkpoint=checkpoint,
+                          log=log)
+    resultado = motor.executa(fonte, args.limite)
+    resultado['invalidas'] = fonte.invalidas
+    imprime_relatorio(resultado)
+    log.imprime_resumo()
+    log.fecha()
@@ -0,0 +1,103 @@
+import argparse
+import json
+import os
+import threading
+import uuid
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+PASTA_FORMULARIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'formulario_local')
+
+# Campos aceitos em cada etapa do cadastro (os mesmos do formulário HTML)
+CAMPOS_ETAPA = {
+    1: ['nome_produto', 'descricao', 'categoria', 'codigo_produto', 'peso', 'dimensoes'],
+    2: ['preco', 'quantidade_estoque', 'data_validade', 'cor', 'tamanho', 'material'],
+    3: ['fabricante', 'pais_origem', 'observacoes', 'codigo_barras', 'localizacao_armazem'],
+}
+
+
+class EstadoCadastro:
+    def __init__(self):
+        self.trava = threading.Lock()
+        self.rascunhos = {}
+        self.produtos = {}
+
+
+class ManipuladorCadastro(SimpleHTTPRequestHandler):
+    """Réplica do cadastro em três etapas.
+
+    GET /            -> formulário HTML (para o robô com navegador)
+    POST /cadastro/etapa1 -> cria um rascunho e devolve {"rascunho_id": ...}
+    POST /cadastro/etapa2 e /cadastro/etapa3 -> completam o rascunho; a etapa 3 inclui o produto
+    GET /produtos    -> produtos incluídos
+    """
+
+    estado = EstadoCadastro()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=PASTA_FORMULARIO, **kwargs)
+
+    def log_message(self, formato, *args):
+        pass  # sem uma linha no terminal por requisição
+
+    def _responde(self, status, corpo):
+        dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _le_formulario(self):
+        tamanho = int(self.headers.get('Content-Length', 0))
+        corpo = self.rfile.read(tamanho).decode('utf-8')
+        return {chave: valores[0] for chave, valores in parse_qs(corpo, keep_blank_values=True).items()}
+
+    def do_GET(self):
+        if self.path == '/produtos':
+            with self.estado.trava:
+                return self._responde(200, list(self.estado.produtos.values()))
+        return super().do_GET()
+
+    def do_POST(self):
+        etapas = {f'/cadastro/etapa{n}': n for n in CAMPOS_ETAPA}
+        if self.path not in etapas:
+            return self._responde(404, {'erro': 'rota inexistente'})
+        etapa = etapas[self.path]
+        dados = self._le_formulario()
+        campos = {campo: dados.get(campo, '') for campo in CAMPOS_ETAPA[etapa]}
+
+        with self.estado.trava:
+            if etapa == 1:
+                if not campos['codigo_produto']:
+                    return self._responde(422, {'erro': 'codigo_produto obrigatório'})
+                if campos['codigo_produto'] in self.estado.produtos:
+                    return self._responde(409, {'erro': 'produto já cadastrado'})
+                rascunho_id = uuid.uuid4().hex
+                self.estado.rascunhos[rascunho_id] = campos
+                return self._responde(201, {'rascunho_id': rascunho_id})
+
+            rascunho = self.estado.rascunhos.get(dados.get('rascunho_id'))
+            if rascunho is None:
+                return self._responde(404, {'erro': 'rascunho não encontrado'})
+            rascunho.update(campos)
+            if etapa < max(CAMPOS_ETAPA):
+                return self._responde(200, {'rascunho_id': dados['rascunho_id']})
+
+            del self.estado.rascunhos[dados['rascunho_id']]
+            self.estado.produtos[rascunho['codigo_produto']] = rascunho
+            return self._responde(201, {'codigo_produto': rascunho['codigo_produto']})
+
+
+def inicia_servidor(host='127.0.0.1', porta=8765):
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorCadastro)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Servidor local que imita o cadastro em três etapas.')
+    parser.add_argument('--porta', type=int, default=8765)
+    args = parser.parse_args()
+    print(f"Servindo em http://127.0.0.1:{args.porta}/ (Ctrl+C para sair)")
+    ThreadingHTTPServer(('127.0.0.1', args.porta), ManipuladorCadastro).serve_forever()
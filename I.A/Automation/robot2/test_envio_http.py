@@ -0,0 +1,95 @@
+"""Envio HTTP contra o servidor_local: python -m unittest test_envio_http (dentro de robot2)."""
+import os
+import tempfile
+import unittest
+
+try:
+    import requests
+    from envio_http import EnvioHTTP
+    from fonte_linhas import Produto, RegistroEnviados
+except ImportError:  # requests/openpyxl não instalados
+    requests = None
+
+from servidor_local import EstadoCadastro, ManipuladorCadastro, inicia_servidor
+
+
+def produto(linha, codigo):
+    return Produto(linha=linha, nome_produto=f'Produto {codigo}', descricao='Teste', categoria='Geral',
+                   codigo_produto=codigo, peso=1.5, dimensoes='10 x 10 x 10', preco=9.9,
+                   quantidade_estoque=3, data_validade='2030-01-01', cor='Azul', tamanho='Médio',
+                   material='Plástico', fabricante='ACME', pais_origem='Brasil', observacoes='',
+                   codigo_barras='7890000000000', localizacao_armazem='A1')
+
+
+@unittest.skipIf(requests is None, 'dependências do envio HTTP ausentes')
+class TestEnvioHTTP(unittest.TestCase):
+    def setUp(self):
+        ManipuladorCadastro.estado = EstadoCadastro()
+        self.servidor = inicia_servidor(porta=0)
+        self.url = f'http://127.0.0.1:{self.servidor.server_address[1]}'
+        self.pasta = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+        self.pasta.cleanup()
+
+    def envio(self, nome_registro='enviados.txt', classe=None):
+        registro = RegistroEnviados(os.path.join(self.pasta.name, nome_registro))
+        return (classe or EnvioHTTP)(self.url, concorrencia=4, por_segundo=0, tentativas=3,
+                                     timeout=5, registro=registro)
+
+    def produtos_no_servidor(self):
+        return requests.get(self.url + '/produtos', timeout=5).json()
+
+    def test_cada_codigo_e_cadastrado_uma_vez(self):
+        produtos = [produto(2, 'P1'), produto(3, 'P2'), produto(4, 'P1'), produto(5, 'P3')]
+        resultado = self.envio().executa(produtos)
+        self.assertEqual(resultado['ok'], 3)
+        self.assertEqual(resultado['duplicadas'], 1)
+        self.assertEqual(resultado['falhas'], [])
+        self.assertEqual(sorted(p['codigo_produto'] for p in self.produtos_no_servidor()), ['P1', 'P2', 'P3'])
+
+    def test_reenvio_nao_duplica(self):
+        produtos = [produto(2, 'P1'), produto(3, 'P2')]
+        self.envio().executa(produtos)
+
+        # Mesmo registro local: nada é reenviado
+        resultado = self.envio().executa(produtos)
+        self.assertEqual((resultado['ok'], resultado['duplicadas'], resultado['requisicoes']), (0, 2, 0))
+
+        # Registro local perdido: o servidor responde 409 e o produto não é incluído de novo
+        resultado = self.envio('outro_registro.txt').executa(produtos)
+        self.assertEqual((resultado['ok'], resultado['duplicadas']), (0, 2))
+        self.assertEqual(len(self.produtos_no_servidor()), 2)
+        self.assertEqual(ManipuladorCadastro.estado.rascunhos, {})
+
+    def test_nova_tentativa_continua_da_etapa_que_falhou(self):
+        rotas = []
+
+        class EnvioInstavel(EnvioHTTP):
+            def _post(self, rota, payload, linha):
+                rotas.append(rota)
+                if rota == '/cadastro/etapa2' and rotas.count(rota) == 1:
+                    raise requests.ConnectionError('queda simulada')
+                return super()._post(rota, payload, linha)
+
+        resultado = self.envio(classe=EnvioInstavel).executa([produto(2, 'P1')])
+        self.assertEqual(resultado['ok'], 1)
+        self.assertEqual(rotas, ['/cadastro/etapa1', '/cadastro/etapa2', '/cadastro/etapa2', '/cadastro/etapa3'])
+        self.assertEqual(ManipuladorCadastro.estado.rascunhos, {})  # nenhum rascunho órfão
+        self.assertEqual(len(self.produtos_no_servidor()), 1)
+
+    def test_erro_inesperado_vira_falha_e_libera_o_codigo(self):
+        class EnvioQuebrado(EnvioHTTP):
+            def _post(self, rota, payload, linha):
+                raise KeyError('resposta inesperada')
+
+        envio = self.envio(classe=EnvioQuebrado)
+        resultado = envio.executa([produto(2, 'P1')])
+        self.assertEqual(len(resultado['falhas']), 1)
+        self.assertTrue(envio.registro.reserva('P1'))  # a reserva foi liberada
+
+
+if __name__ == '__main__':
+    unittest.main()